@@ -0,0 +1,245 @@
+"""Benchmarks for the Streamlit app's rerun latency and fetch throughput.
+
+Everything runs offline against FakeProvider with a configurable latency,
+so numbers are reproducible and comparable between commits:
+
+    python benchmarks/bench_app.py --save benchmarks/baseline.json
+    python benchmarks/bench_app.py --compare benchmarks/baseline.json
+
+Reported metrics:
+- cold and warm full-page rerun latency of main() through Streamlit's AppTest
+- warm rerun latency of the converter fragment alone, which is all an
+  amount change reruns in a browser session
+- p50/p95/p99 of each fetch function, cold (empty caches) and warm
+- scalar and bulk conversions per second
+- peak resident memory of the benchmark process
+
+--compare exits with status 1 when any metric regresses by more than
+--tolerance relative to the saved baseline.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, 'src')
+APP_PATH = os.path.join(SRC, 'app.py')
+sys.path.insert(0, SRC)
+
+# Metrics where a bigger number is better; all others are latencies or sizes
+HIGHER_IS_BETTER = ('per_sec',)
+
+
+def percentiles(samples):
+    """p50/p95/p99 of a list of seconds, in milliseconds"""
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {'p50_ms': pick(0.50), 'p95_ms': pick(0.95), 'p99_ms': pick(0.99)}
+
+
+def timed(fn, iterations, setup=None):
+    samples = []
+    for _ in range(iterations):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def reset_caches():
+    """Forget everything cached in memory and on disk"""
+    from fxcore.history_store import HistoryStore, set_history_store
+    from fxcore.rate_cache import RATE_CACHE
+
+    RATE_CACHE.invalidate()
+    set_history_store(HistoryStore(':memory:'))
+
+
+def bench_reruns(iterations):
+    from streamlit.testing.v1 import AppTest
+
+    reset_caches()
+    app = AppTest.from_file(APP_PATH, default_timeout=60)
+    start = time.perf_counter()
+    app.run()
+    cold = time.perf_counter() - start
+    if app.exception:
+        raise RuntimeError(f"main() raised: {app.exception[0].message}")
+
+    # AppTest reruns the whole script on every widget change, fragments included
+    amounts = iter(range(2, iterations + 2))
+    warm = timed(lambda: app.number_input[0].set_value(float(next(amounts))).run(), iterations)
+    return {'page_rerun_cold_ms': cold * 1000, 'page_rerun_warm': percentiles(warm)}
+
+
+def converter_fragment_script(src):
+    """Renders only the converter fragment, as a fragment rerun would"""
+    import sys
+
+    import streamlit as st
+
+    sys.path.insert(0, src)
+    import app
+
+    # A fragment rerun reuses the arguments of the last full run
+    if 'bench_currencies' not in st.session_state:
+        st.session_state.bench_currencies = app.fetch_currencies()
+    app.render_converter(st.session_state.bench_currencies, ('USD', 'EUR'))
+
+
+def bench_converter_fragment(iterations):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_function(converter_fragment_script, args=(SRC,), default_timeout=60)
+    app.run()
+    # Convert once so every amount change redraws the converted figure
+    app.button[0].click().run()
+    if app.exception:
+        raise RuntimeError(f"render_converter() raised: {app.exception[0].message}")
+
+    amounts = iter(range(2, iterations + 2))
+    warm = timed(lambda: app.number_input[0].set_value(float(next(amounts))).run(), iterations)
+    return {'converter_fragment_rerun_warm': percentiles(warm)}
+
+
+def bench_fetch_functions(fx, iterations, cold_iterations):
+    pairs = [('USD', 'EUR'), ('GBP', 'JPY'), ('EUR', 'CHF'), ('AUD', 'CAD')]
+    calls = {
+        'fetch_currencies': lambda pair: fx.fetch_currencies(),
+        'fetch_exchange_rate': lambda pair: fx.fetch_exchange_rate(*pair, 100.0),
+        'fetch_historical_data': lambda pair: fx.fetch_historical_data(*pair),
+    }
+    results = {}
+    for name, call in calls.items():
+        def sample():
+            call(random.choice(pairs))
+
+        results[f'{name}_cold'] = percentiles(timed(sample, cold_iterations, setup=reset_caches))
+        for pair in pairs:
+            call(pair)
+        results[f'{name}_warm'] = percentiles(timed(sample, iterations))
+    return results
+
+
+def bench_conversions(fx, scalar_rows, bulk_rows):
+    import numpy as np
+
+    codes = fx.fetch_currencies()
+    rng = random.Random(0)
+    pairs = [(rng.choice(codes), rng.choice(codes)) for _ in range(scalar_rows)]
+    fx.fetch_exchange_rate('USD', 'EUR')
+
+    start = time.perf_counter()
+    for from_curr, to_curr in pairs:
+        fx.fetch_exchange_rate(from_curr, to_curr, 10.0)
+    scalar = scalar_rows / (time.perf_counter() - start)
+
+    gen = np.random.default_rng(0)
+    amounts = gen.random(bulk_rows) * 1000
+    from_codes = gen.choice(codes, bulk_rows)
+    to_codes = gen.choice(codes, bulk_rows)
+    start = time.perf_counter()
+    fx.convert_many(amounts, from_codes, to_codes)
+    bulk = bulk_rows / (time.perf_counter() - start)
+
+    return {'scalar_conversions_per_sec': scalar, 'bulk_conversions_per_sec': bulk}
+
+
+def run(args):
+    import fxcore
+
+    fxcore.set_provider(fxcore.FakeProvider(latency=args.latency))
+    results = {'config': {'latency_s': args.latency, 'iterations': args.iterations}}
+    results.update(bench_reruns(args.reruns))
+    results.update(bench_converter_fragment(args.reruns))
+    results.update(bench_fetch_functions(fxcore, args.iterations, args.cold_iterations))
+    results.update(bench_conversions(fxcore, args.scalar_rows, args.bulk_rows))
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+
+def flatten(results, prefix=''):
+    flat = {}
+    for key, value in results.items():
+        if key == 'config':
+            continue
+        if isinstance(value, dict):
+            flat.update(flatten(value, f'{prefix}{key}.'))
+        elif value is not None:
+            flat[f'{prefix}{key}'] = value
+    return flat
+
+
+def compare(results, baseline, tolerance):
+    """Print metric deltas against a baseline; return the regressed metrics"""
+    current, previous = flatten(results), flatten(baseline)
+    regressions = []
+    print(f"\n{'metric':<45}{'baseline':>14}{'current':>14}{'change':>10}")
+    for name in sorted(current):
+        if name not in previous or not previous[name]:
+            continue
+        change = (current[name] - previous[name]) / previous[name]
+        higher_better = name.endswith(HIGHER_IS_BETTER)
+        regressed = -change > tolerance if higher_better else change > tolerance
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<45}{previous[name]:>14.3f}{current[name]:>14.3f}{change:>+9.1%}"
+              f"{'  REGRESSED' if regressed else ''}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--latency', type=float, default=0.05, help="fake provider latency in seconds")
+    parser.add_argument('--iterations', type=int, default=200, help="warm calls per fetch function")
+    parser.add_argument('--cold-iterations', type=int, default=10, help="cold calls per fetch function")
+    parser.add_argument('--reruns', type=int, default=20, help="warm reruns of main() and of the converter fragment")
+    parser.add_argument('--scalar-rows', type=int, default=20_000)
+    parser.add_argument('--bulk-rows', type=int, default=1_000_000)
+    parser.add_argument('--save', metavar='PATH', help="write results as a JSON baseline")
+    parser.add_argument('--compare', metavar='PATH', help="compare against a saved baseline")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="allowed regression ratio")
+    args = parser.parse_args(argv)
+
+    # Keep the benchmark away from the user's real history database
+    os.environ.setdefault('FX_HISTORY_DB', os.path.join(tempfile.mkdtemp(), 'history.sqlite3'))
+
+    results = run(args)
+    for name, value in flatten(results).items():
+        print(f"{name:<45}{value:>14.3f}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
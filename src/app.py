@@ -1,6 +1,26 @@
+import math
+import os
+
+import pandas as pd
 import streamlit as st
 import requests
-from datetime import datetime, timedelta
+
+from fxcore.api import (CURRENCY_NAMES, FALLBACK_CURRENCIES, UNSUPPORTED_CURRENCIES,
+                        UnsupportedCurrencyError, fetch_exchange_rate, history_window,
+                        load_currencies, load_rate_series)
+from fxcore.async_client import prefetch
+from fxcore.budget import upstream_budget
+from fxcore.cross_matrix import fetch_cross_matrix
+from fxcore.downsample import MAX_CHART_POINTS
+from fxcore.frankfurter import CLIENT
+from fxcore.history_frame import fetch_history_frame
+from fxcore.metrics import FRAGMENT_SECONDS, RATE_LIMIT_WAIT_SECONDS, RERUN_SECONDS, UPSTREAM_SECONDS, start_from_env
+from fxcore.rate_cache import RATE_CACHE
+from fxcore.ratelimit import LIMITER
+from fxcore.refresher import REFRESHER
+from fxcore.rolling import pair_stats
+from fxcore.series import RateSeries
+from fxcore.snapshot import warm_start_from_env
 
 # Page configuration
 st.set_page_config(
@@ -58,80 +78,10 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Comprehensive currency list with names
-CURRENCY_NAMES = {
-    # Major World Currencies
-    'USD': 'US Dollar',
-    'EUR': 'Euro',
-    'GBP': 'British Pound',
-    'JPY': 'Japanese Yen',
-    'CAD': 'Canadian Dollar',
-    'AUD': 'Australian Dollar',
-    'CHF': 'Swiss Franc',
-    'CNY': 'Chinese Yuan',
-    'INR': 'Indian Rupee',
-
-    # African Currencies
-    'NGN': 'Nigerian Naira',
-    'ZAR': 'South African Rand',
-    'EGP': 'Egyptian Pound',
-    'MAD': 'Moroccan Dirham',
-    'TND': 'Tunisian Dinar',
-    'KES': 'Kenyan Shilling',
-    'UGX': 'Ugandan Shilling',
-    'TZS': 'Tanzanian Shilling',
-    'GHS': 'Ghanaian Cedi',
-    'XOF': 'West African CFA Franc',
-    'XAF': 'Central African CFA Franc',
-    'BWP': 'Botswana Pula',
-    'MZN': 'Mozambican Metical',
-    'AOA': 'Angolan Kwanza',
-    'ZMW': 'Zambian Kwacha',
-    'RWF': 'Rwandan Franc',
-    'ETB': 'Ethiopian Birr',
-    'MUR': 'Mauritian Rupee',
-    'MWK': 'Malawian Kwacha',
-
-    # European Currencies
-    'NOK': 'Norwegian Krone',
-    'SEK': 'Swedish Krona',
-    'DKK': 'Danish Krone',
-    'PLN': 'Polish Zloty',
-    'HUF': 'Hungarian Forint',
-    'CZK': 'Czech Koruna',
-    'RON': 'Romanian Leu',
-    'BGN': 'Bulgarian Lev',
-    'HRK': 'Croatian Kuna',
-
-    # Asian Currencies
-    'KRW': 'South Korean Won',
-    'SGD': 'Singapore Dollar',
-    'HKD': 'Hong Kong Dollar',
-    'THB': 'Thai Baht',
-    'MYR': 'Malaysian Ringgit',
-    'IDR': 'Indonesian Rupiah',
-    'PHP': 'Philippine Peso',
-
-    # Other Major Currencies
-    'BRL': 'Brazilian Real',
-    'MXN': 'Mexican Peso',
-    'RUB': 'Russian Ruble',
-    'TRY': 'Turkish Lira',
-    'NZD': 'New Zealand Dollar',
-    'ILS': 'Israeli Shekel',
-
-    # Middle East
-    'AED': 'UAE Dirham',
-    'SAR': 'Saudi Riyal',
-    'QAR': 'Qatari Riyal',
-    'KWD': 'Kuwaiti Dinar',
-}
-
-# Unsupported currencies (not in Frankfurter API)
-UNSUPPORTED_CURRENCIES = [
-    'NGN', 'KES', 'UGX', 'TZS', 'GHS', 'RWF', 'ETB', 'MWK',
-    'XOF', 'XAF', 'BWP', 'MZN', 'AOA', 'ZMW', 'MAD', 'TND'
-]
+# Chart periods offered in the trends panel, in days
+HISTORY_PERIODS = {'1M': 30, '3M': 91, '6M': 182, '1Y': 365, '5Y': 1826, '10Y': 3652}
+# Rolling statistics windows, in days
+STATS_WINDOWS = [7, 30, 90, 365]
 
 def get_default_currencies():
     """Get default currencies based on user's locale"""
@@ -149,207 +99,98 @@ def get_default_currencies():
         return 'USD', 'EUR'
 
 def fetch_currencies():
-    """Fetch available currencies from Frankfurter API"""
+    """Fetch available currencies, reporting provider errors on the page"""
     try:
-        response = requests.get("https://api.frankfurter.app/currencies", timeout=10)
-        response.raise_for_status()
-        api_currencies = list(response.json().keys())
-
-        # Add essential African currencies that may not be in API
-        essential_african = [
-            'NGN', 'ZAR', 'EGP', 'MAD', 'TND', 'KES', 'UGX', 'TZS', 'GHS',
-            'XOF', 'XAF', 'BWP', 'MZN', 'AOA', 'ZMW', 'RWF', 'ETB', 'MUR', 'MWK'
-        ]
-
-        # Major world currencies
-        major_currencies = ['USD', 'EUR', 'GBP', 'JPY', 'CAD', 'AUD', 'CHF', 'CNY', 'INR']
-
-        # Combine all currencies
-        all_currencies = sorted(list(set(api_currencies + essential_african + major_currencies)))
-
-        return all_currencies
+        return load_currencies()
     except Exception as e:
         st.error(f"Error fetching currencies: {e}")
-        # Fallback currencies
-        return ['USD', 'EUR', 'GBP', 'JPY', 'CAD', 'AUD', 'CHF', 'CNY', 'INR',
-                'NGN', 'ZAR', 'EGP', 'MAD', 'KES', 'GHS', 'UGX', 'TZS']
-
-def fetch_exchange_rate(from_curr, to_curr, amount=1.0):
-    """Fetch exchange rate from Frankfurter API"""
-    if from_curr == to_curr:
-        return {
-            'rate': 1.0,
-            'converted_amount': amount,
-            'error': None,
-            'unsupported': None,
-            'temporarily_unavailable': None
-        }
-
-    # Check for unsupported currencies
-    if from_curr in UNSUPPORTED_CURRENCIES:
-        return {
-            'rate': None,
-            'converted_amount': None,
-            'error': f"{from_curr} is not supported by our exchange rate provider.",
-            'unsupported': from_curr,
-            'temporarily_unavailable': None
-        }
-
-    if to_curr in UNSUPPORTED_CURRENCIES:
-        return {
-            'rate': None,
-            'converted_amount': None,
-            'error': f"{to_curr} is not supported by our exchange rate provider.",
-            'unsupported': to_curr,
-            'temporarily_unavailable': None
-        }
-
-    try:
-        url = f"https://api.frankfurter.app/latest?from={from_curr}&to={to_curr}"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-
-        data = response.json()
-        rate = data['rates'].get(to_curr)
-
-        if rate:
-            return {
-                'rate': rate,
-                'converted_amount': amount * rate,
-                'error': None,
-                'unsupported': None,
-                'temporarily_unavailable': None
-            }
-        else:
-            return {
-                'rate': None,
-                'converted_amount': None,
-                'error': f"Exchange rate for {to_curr} is not available.",
-                'unsupported': to_curr,
-                'temporarily_unavailable': None
-            }
-
-    except requests.exceptions.RequestException as e:
-        return {
-            'rate': None,
-            'converted_amount': None,
-            'error': f"Network error: {str(e)}",
-            'unsupported': None,
-            'temporarily_unavailable': from_curr
-        }
-    except Exception as e:
-        return {
-            'rate': None,
-            'converted_amount': None,
-            'error': f"Unexpected error: {str(e)}",
-            'unsupported': None,
-            'temporarily_unavailable': from_curr
-        }
-
-def fetch_historical_data(from_curr, to_curr, days=30):
-    """Fetch historical exchange rate data"""
-    # Check for unsupported currencies first
-    if from_curr in UNSUPPORTED_CURRENCIES:
-        st.info(f"Historical data not available for {from_curr}. This currency is not supported by our exchange rate provider.")
-        return [], []
-
-    if to_curr in UNSUPPORTED_CURRENCIES:
-        st.info(f"Historical data not available for {to_curr}. This currency is not supported by our exchange rate provider.")
-        return [], []
+        return list(FALLBACK_CURRENCIES)
 
+def fetch_rate_series(from_curr, to_curr, days=30, start=None, end=None):
+    """Fetch historical exchange rates as a RateSeries, explaining gaps on the page"""
     try:
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-
-        url = f"https://api.frankfurter.app/{start_date.strftime('%Y-%m-%d')}..{end_date.strftime('%Y-%m-%d')}?from={from_curr}&to={to_curr}"
-        response = requests.get(url, timeout=15)
-        response.raise_for_status()
-
-        data = response.json()
-
-        # Process the data
-        dates = []
-        rates = []
-
-        for date_str, rates_data in sorted(data['rates'].items()):
-            if to_curr in rates_data:
-                dates.append(date_str)
-                rates.append(rates_data[to_curr])
-
-        return dates, rates
-
-    except Exception as e:
+        return load_rate_series(from_curr, to_curr, days, start, end)
+    except UnsupportedCurrencyError as e:
+        st.info(f"Historical data not available for {e.code}. This currency is not supported by our exchange rate provider.")
+    except Exception:
         st.info("Historical data not available for this currency pair. This is common for some currencies.")
-        return [], []
-
-def main():
-    # Header
-    st.markdown('<h1 class="main-header">💱 Currency Exchange</h1>', unsafe_allow_html=True)
-    st.markdown('<p class="sub-header">Real-time exchange rates with live historical data</p>', unsafe_allow_html=True)
-
-    # Sidebar with developer info
-    with st.sidebar:
-        st.header("👨‍💻 Developer")
-        st.markdown("""
-        **Joseph Theophilus Odubena**
-        *Full Stack Developer*
-
-        Passionate about solving humanity's challenges through technology. Building innovative solutions across various sectors.
-        """)
-
-        st.markdown("---")
-        st.markdown("### 🔗 Connect")
-        col1, col2 = st.columns(2)
-        with col1:
-            st.markdown("[LinkedIn](https://www.linkedin.com/in/theophilus-odubena-180148180/)")
-        with col2:
-            st.markdown("[GitHub](https://github.com/1JTheo)")
-
-        st.markdown("---")
-        st.markdown("### 📊 Features")
-        st.markdown("✅ Real-time rates\n✅ Historical data\n✅ 65+ currencies\n✅ Mobile-friendly")
-
-    # Main content
-    col1, col2 = st.columns([1, 1])
-
-    with col1:
+    return RateSeries()
+
+def render_operator_panel():
+    """Cache, upstream and rerun figures for operators (FX_OPERATOR_PANEL=1)"""
+    st.markdown("---")
+    st.markdown("### 🛠️ Operator")
+    stats = RATE_CACHE.stats()
+    st.markdown(
+        f"**Cache:** {stats['hit_ratio']:.1%} hits · {stats['entries']} entries · "
+        f"{stats['bytes'] / 1024:.0f} KiB · {stats['negative_entries']} failures remembered"
+    )
+    st.markdown(f"**Upstream circuit:** {CLIENT.breaker.state}")
+    waits = RATE_LIMIT_WAIT_SECONDS.summary()
+    for priority, depth in LIMITER.queued().items():
+        count, mean = waits.get((priority,), (0, 0.0))
+        st.markdown(f"**Rate limit {priority}:** {depth} queued · {count} admitted · {mean * 1000:.0f} ms avg wait")
+    for (endpoint, status), (count, mean) in sorted(UPSTREAM_SECONDS.summary().items()):
+        st.markdown(f"**{endpoint}** {status}: {count} calls · {mean * 1000:.0f} ms avg")
+    reruns = RERUN_SECONDS.summary().get((), (0, 0.0))
+    st.markdown(f"**Reruns:** {reruns[0]} · {reruns[1] * 1000:.0f} ms avg")
+    for (fragment,), (count, mean) in sorted(FRAGMENT_SECONDS.summary().items()):
+        st.markdown(f"**{fragment.capitalize()} renders:** {count} · {mean * 1000:.0f} ms avg")
+
+
+def avoid_same_currency():
+    """Move To off the currency just picked as From"""
+    if st.session_state['from_currency'] == st.session_state.get('to_currency'):
+        st.session_state['to_currency'] = 'GBP' if st.session_state['from_currency'] == 'EUR' else 'EUR'
+
+
+@st.fragment
+def render_converter(currencies, pair):
+    """Converter panel; editing the amount reruns only this fragment"""
+    with FRAGMENT_SECONDS.time(fragment='converter'), upstream_budget():
         st.subheader("💰 Currency Converter")
 
-        # Get available currencies
-        currencies = fetch_currencies()
-
         # Amount input
         amount = st.number_input(
             "Amount",
             min_value=0.0,
             value=1.0,
             step=0.01,
-            format="%.2f"
+            format="%.2f",
+            key='amount'
         )
 
-        # Currency selectors
+        # Currency selectors, seeded once; afterwards the widgets keep their values
+        if 'from_currency' not in st.session_state:
+            st.session_state['from_currency'] = 'USD' if 'USD' in currencies else currencies[0]
+        if 'to_currency' not in st.session_state:
+            # Default to EUR, but avoid same currency
+            default_to = 'EUR' if st.session_state['from_currency'] != 'EUR' else 'GBP'
+            st.session_state['to_currency'] = default_to if default_to in currencies else currencies[min(1, len(currencies) - 1)]
+
         col_from, col_to = st.columns(2)
 
         with col_from:
             from_currency = st.selectbox(
                 "From Currency",
                 currencies,
-                index=currencies.index('USD') if 'USD' in currencies else 0,
+                key='from_currency',
+                on_change=avoid_same_currency,
                 format_func=lambda x: f"{x} - {CURRENCY_NAMES.get(x, 'Unknown')}"
             )
 
         with col_to:
-            # Default to EUR, but avoid same currency
-            default_to = 'EUR' if from_currency != 'EUR' else 'GBP'
-            to_index = currencies.index(default_to) if default_to in currencies else (1 if len(currencies) > 1 else 0)
-
             to_currency = st.selectbox(
                 "To Currency",
                 currencies,
-                index=to_index,
+                key='to_currency',
                 format_func=lambda x: f"{x} - {CURRENCY_NAMES.get(x, 'Unknown')}"
             )
 
+        if (from_currency, to_currency) != pair:
+            # The trends panel charts the pair too, so a new pair redraws the whole page
+            st.rerun(scope='app')
+
         # Convert button
         if st.button("🔄 Convert", type="primary", use_container_width=True):
             if from_currency == to_currency:
@@ -359,6 +200,7 @@ def main():
                     result = fetch_exchange_rate(from_currency, to_currency, amount)
 
                     if result['error']:
+                        st.session_state.pop('conversion', None)
                         if result['unsupported']:
                             st.markdown(f'<div class="error-box">❌ {result["unsupported"]} is not supported by our exchange rate provider.</div>', unsafe_allow_html=True)
                         elif result['temporarily_unavailable']:
@@ -366,31 +208,71 @@ def main():
                         else:
                             st.markdown(f'<div class="error-box">❌ {result["error"]}</div>', unsafe_allow_html=True)
                     else:
-                        st.markdown('<div class="result-box">', unsafe_allow_html=True)
-                        st.markdown(f"### {result['converted_amount']:.2f} {to_currency}")
-                        st.markdown(f"**Exchange Rate:** 1 {from_currency} = {result['rate']:.6f} {to_currency}")
-                        st.markdown(f"**Last Updated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                        st.markdown('</div>', unsafe_allow_html=True)
-
-    with col2:
+                        st.session_state['conversion'] = dict(result, pair=(from_currency, to_currency))
+
+        # The converted rate is kept, so a new amount costs one multiplication
+        result = st.session_state.get('conversion')
+        if result and result['pair'] == (from_currency, to_currency):
+            st.markdown('<div class="result-box">', unsafe_allow_html=True)
+            st.markdown(f"### {amount * result['rate']:.2f} {to_currency}")
+            st.markdown(f"**Exchange Rate:** 1 {from_currency} = {result['rate']:.6f} {to_currency}")
+            st.markdown(f"**Last Updated:** {result['fetched_at'].strftime('%Y-%m-%d %H:%M:%S')} (rates of {result['as_of']})")
+            st.markdown('</div>', unsafe_allow_html=True)
+
+        # Rates board: one row of the cross-rate matrix covers every currency
+        if st.checkbox(f"📋 Show {from_currency} against all currencies"):
+            try:
+                matrix = fetch_cross_matrix(currencies)
+                board = [
+                    {
+                        "Currency": f"{code} - {CURRENCY_NAMES.get(code, 'Unknown')}",
+                        "Rate": f"{rate:.6f}",
+                        "Converted": f"{amount * rate:.2f}"
+                    }
+                    for code, rate in zip(matrix.codes, matrix.row(from_currency))
+                    if code != from_currency and not math.isnan(rate)
+                ]
+                if board:
+                    st.dataframe(board, hide_index=True, use_container_width=True)
+                else:
+                    st.info(f"No rates available for {from_currency}.")
+            except requests.exceptions.RequestException:
+                st.markdown('<div class="warning-box">⚠️ Rates are temporarily unavailable due to network issues.</div>', unsafe_allow_html=True)
+
+@st.fragment
+def render_trends(currencies, from_currency, to_currency):
+    """Chart, statistics and watchlist; period and window changes rerun only this fragment"""
+    with FRAGMENT_SECONDS.time(fragment='trends'), upstream_budget():
         st.subheader("📈 Historical Trends")
 
         if from_currency != to_currency:
-            with st.spinner("Loading historical data..."):
-                dates, rates = fetch_historical_data(from_currency, to_currency)
+            period = st.radio("Period", list(HISTORY_PERIODS), horizontal=True, key='history_period')
+            windows = [w for w in STATS_WINDOWS if w <= HISTORY_PERIODS[period]]
+            stats_window = st.selectbox(
+                "Statistics window", windows, index=min(1, len(windows) - 1),
+                key='stats_window', format_func=lambda w: f"{w} days"
+            )
 
-                if dates and rates:
-                    # Display chart using streamlit's built-in chart
-                    chart_data = {f"{from_currency} to {to_currency}": rates}
+            with st.spinner("Loading historical data..."):
+                series = fetch_rate_series(from_currency, to_currency, HISTORY_PERIODS[period])
+
+                if len(series):
+                    # Long ranges are reduced to about one point per pixel before charting
+                    chart = series.downsample(MAX_CHART_POINTS)
+                    chart_data = pd.DataFrame(
+                        {f"{from_currency} to {to_currency}": chart.rates},
+                        index=chart.datetimes
+                    )
                     st.line_chart(chart_data)
 
                     # Show latest data in a simple table
                     st.markdown("**Recent Rates:**")
+                    recent = series[-5:]
                     recent_data = []
-                    for i in range(max(0, len(dates)-5), len(dates)):
+                    for date_str, rate in zip(recent.dates, recent.rates):
                         recent_data.append({
-                            "Date": dates[i],
-                            "Rate": f"{rates[i]:.6f}"
+                            "Date": date_str,
+                            "Rate": f"{rate:.6f}"
                         })
 
                     if recent_data:
@@ -399,16 +281,121 @@ def main():
                     # Statistics
                     col_stats1, col_stats2, col_stats3 = st.columns(3)
                     with col_stats1:
-                        st.metric("Current Rate", f"{rates[-1]:.6f}")
+                        st.metric("Current Rate", f"{series.last:.6f}")
                     with col_stats2:
-                        st.metric("30-Day High", f"{max(rates):.6f}")
+                        st.metric(f"{period} High", f"{series.high:.6f}")
                     with col_stats3:
-                        st.metric("30-Day Low", f"{min(rates):.6f}")
+                        st.metric(f"{period} Low", f"{series.low:.6f}")
+
+                    # Rolling statistics, updated incrementally as new fixings arrive
+                    stats = pair_stats((from_currency, to_currency), series, stats_window)
+                    col_roll1, col_roll2, col_roll3, col_roll4 = st.columns(4)
+                    with col_roll1:
+                        st.metric(f"{stats_window}-Day Average", f"{stats['mean']:.6f}")
+                    with col_roll2:
+                        st.metric(f"{stats_window}-Day High", f"{stats['high']:.6f}")
+                    with col_roll3:
+                        st.metric(f"{stats_window}-Day Low", f"{stats['low']:.6f}")
+                    with col_roll4:
+                        st.metric(f"{stats_window}-Day Change", f"{stats['change_pct']:+.2f}%")
+                    if stats['volatility'] is not None:
+                        st.caption(f"Annualized volatility over {stats_window} days: {stats['volatility']:.2f}%")
                 else:
                     st.info("Historical data not available for this currency pair. This is common for African currencies.")
+
+            # Watchlist comparison: one range request covers every quote
+            watchlist = st.multiselect(
+                f"Compare {from_currency} against",
+                [c for c in currencies if c not in (from_currency, to_currency) and c not in UNSUPPORTED_CURRENCIES],
+                key='watchlist',
+                format_func=lambda x: f"{x} - {CURRENCY_NAMES.get(x, 'Unknown')}"
+            )
+            if watchlist:
+                try:
+                    with st.spinner("Loading comparison..."):
+                        frame = fetch_history_frame(from_currency, [to_currency] + watchlist, HISTORY_PERIODS[period])
+                    if len(frame):
+                        st.markdown(f"**{from_currency} against your watchlist** (indexed to 100)")
+                        # Reduced like the main chart; the first fixing of each quote is kept, so rebasing is unchanged
+                        chart = frame.downsample(MAX_CHART_POINTS)
+                        st.line_chart(pd.DataFrame(chart.rebased(), index=chart.dates))
+                        rolling = frame.rolling(stats_window)
+                        st.table([
+                            {
+                                "Currency": quote,
+                                f"{stats_window}-Day Change": f"{rolling['change_pct'][-1, i]:+.2f}%",
+                                "Volatility": f"{rolling['volatility'][-1, i]:.2f}%",
+                            }
+                            for i, quote in enumerate(frame.quotes)
+                        ])
+                    else:
+                        st.info("Historical data not available for the selected currencies.")
+                except requests.exceptions.RequestException:
+                    st.markdown('<div class="warning-box">⚠️ Comparison data is temporarily unavailable due to network issues.</div>', unsafe_allow_html=True)
         else:
             st.info("Select different currencies to view historical trends.")
 
+def main():
+    # Exposes /metrics when FX_METRICS_PORT is set
+    start_from_env()
+    # Loads the FX_SNAPSHOT rate snapshot once per process
+    warm_start_from_env()
+
+    # Header
+    st.markdown('<h1 class="main-header">💱 Currency Exchange</h1>', unsafe_allow_html=True)
+    st.markdown('<p class="sub-header">Real-time exchange rates with live historical data</p>', unsafe_allow_html=True)
+
+    # Keeps the latest snapshot and popular histories warm for every session
+    REFRESHER.start()
+
+    # The converter fragment owns the pair widgets and reruns the page when they change
+    from_currency = st.session_state.get('from_currency', 'USD')
+    to_currency = st.session_state.get('to_currency', 'EUR')
+
+    # Fire the currency list, latest rates and history requests concurrently;
+    # the fetch functions below then answer from the warmed caches
+    history_pairs = []
+    if from_currency != to_currency and not {from_currency, to_currency} & set(UNSUPPORTED_CURRENCIES):
+        history_pairs.append((from_currency, to_currency))
+    period_days = HISTORY_PERIODS[st.session_state.get('history_period', '1M')]
+    prefetch(history_pairs, history_window(period_days))
+
+    # Sidebar with developer info
+    with st.sidebar:
+        st.header("👨‍💻 Developer")
+        st.markdown("""
+        **Joseph Theophilus Odubena**
+        *Full Stack Developer*
+
+        Passionate about solving humanity's challenges through technology. Building innovative solutions across various sectors.
+        """)
+
+        st.markdown("---")
+        st.markdown("### 🔗 Connect")
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("[LinkedIn](https://www.linkedin.com/in/theophilus-odubena-180148180/)")
+        with col2:
+            st.markdown("[GitHub](https://github.com/1JTheo)")
+
+        st.markdown("---")
+        st.markdown("### 📊 Features")
+        st.markdown("✅ Real-time rates\n✅ Historical data\n✅ 65+ currencies\n✅ Mobile-friendly")
+
+        if os.environ.get('FX_OPERATOR_PANEL') == '1':
+            render_operator_panel()
+
+    # Main content
+    col1, col2 = st.columns([1, 1])
+
+    with col1:
+        # Get available currencies
+        currencies = fetch_currencies()
+        render_converter(currencies, (from_currency, to_currency))
+
+    with col2:
+        render_trends(currencies, from_currency, to_currency)
+
     # Footer
     st.markdown("""
     <div class="footer">
@@ -418,5 +405,7 @@ def main():
     """, unsafe_allow_html=True)
 
 if __name__ == "__main__":
-    main()
+    # Every upstream call in one rerun shares a single time budget
+    with RERUN_SECONDS.time(), upstream_budget():
+        main()
 
@@ -0,0 +1,65 @@
+"""Headless currency exchange core.
+
+The data layer behind the Streamlit app, usable from batch jobs and API
+servers without importing Streamlit. Names are resolved lazily, so
+``import fxcore`` is cheap and NumPy, httpx or pandas are only loaded by
+the features that need them.
+"""
+import importlib
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'CURRENCY_NAMES': 'api',
+    'UNSUPPORTED_CURRENCIES': 'api',
+    'UnsupportedCurrencyError': 'api',
+    'fetch_currencies': 'api',
+    'fetch_exchange_rate': 'api',
+    'fetch_exchange_rate_on': 'api',
+    'fetch_historical_data': 'api',
+    'history_window': 'api',
+    'load_currencies': 'api',
+    'load_historical_data': 'api',
+    'load_rate_series': 'api',
+    'prefetch': 'async_client',
+    'AS_OF_INDEX': 'asof',
+    'AsOfIndex': 'asof',
+    'CrossRateMatrix': 'cross_matrix',
+    'convert_many': 'cross_matrix',
+    'fetch_cross_matrix': 'cross_matrix',
+    'HistoryFrame': 'history_frame',
+    'fetch_history_frame': 'history_frame',
+    'RollingStats': 'rolling',
+    'pair_stats': 'rolling',
+    'rolling_stats': 'rolling',
+    'HistoryStore': 'history_store',
+    'load_history': 'history_store',
+    'load_history_multi': 'history_store',
+    'load_series': 'history_store',
+    'FakeProvider': 'providers',
+    'FrankfurterProvider': 'providers',
+    'RateProvider': 'providers',
+    'get_provider': 'providers',
+    'set_provider': 'providers',
+    'RATE_CACHE': 'rate_cache',
+    'RateTable': 'rate_table',
+    'RateSeries': 'series',
+    'export_snapshot': 'snapshot',
+    'import_snapshot': 'snapshot',
+    'fetch_rate_table': 'rate_table',
+    'fetch_rate_table_on': 'rate_table',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,317 @@
+"""Headless conversion API: currency registry and the fetch functions.
+
+Nothing here imports Streamlit. Functions either return the same values
+the app has always shown, or raise for the caller to present (load_*).
+"""
+import logging
+from datetime import datetime, timedelta
+
+import requests
+
+from .asof import AS_OF_INDEX
+from .history_store import load_series
+from .providers import get_provider
+from .rate_table import fetch_rate_table
+from .refresher import REFRESHER
+
+logger = logging.getLogger(__name__)
+
+# Comprehensive currency list with names
+CURRENCY_NAMES = {
+    # Major World Currencies
+    'USD': 'US Dollar',
+    'EUR': 'Euro',
+    'GBP': 'British Pound',
+    'JPY': 'Japanese Yen',
+    'CAD': 'Canadian Dollar',
+    'AUD': 'Australian Dollar',
+    'CHF': 'Swiss Franc',
+    'CNY': 'Chinese Yuan',
+    'INR': 'Indian Rupee',
+
+    # African Currencies
+    'NGN': 'Nigerian Naira',
+    'ZAR': 'South African Rand',
+    'EGP': 'Egyptian Pound',
+    'MAD': 'Moroccan Dirham',
+    'TND': 'Tunisian Dinar',
+    'KES': 'Kenyan Shilling',
+    'UGX': 'Ugandan Shilling',
+    'TZS': 'Tanzanian Shilling',
+    'GHS': 'Ghanaian Cedi',
+    'XOF': 'West African CFA Franc',
+    'XAF': 'Central African CFA Franc',
+    'BWP': 'Botswana Pula',
+    'MZN': 'Mozambican Metical',
+    'AOA': 'Angolan Kwanza',
+    'ZMW': 'Zambian Kwacha',
+    'RWF': 'Rwandan Franc',
+    'ETB': 'Ethiopian Birr',
+    'MUR': 'Mauritian Rupee',
+    'MWK': 'Malawian Kwacha',
+
+    # European Currencies
+    'NOK': 'Norwegian Krone',
+    'SEK': 'Swedish Krona',
+    'DKK': 'Danish Krone',
+    'PLN': 'Polish Zloty',
+    'HUF': 'Hungarian Forint',
+    'CZK': 'Czech Koruna',
+    'RON': 'Romanian Leu',
+    'BGN': 'Bulgarian Lev',
+    'HRK': 'Croatian Kuna',
+
+    # Asian Currencies
+    'KRW': 'South Korean Won',
+    'SGD': 'Singapore Dollar',
+    'HKD': 'Hong Kong Dollar',
+    'THB': 'Thai Baht',
+    'MYR': 'Malaysian Ringgit',
+    'IDR': 'Indonesian Rupiah',
+    'PHP': 'Philippine Peso',
+
+    # Other Major Currencies
+    'BRL': 'Brazilian Real',
+    'MXN': 'Mexican Peso',
+    'RUB': 'Russian Ruble',
+    'TRY': 'Turkish Lira',
+    'NZD': 'New Zealand Dollar',
+    'ILS': 'Israeli Shekel',
+
+    # Middle East
+    'AED': 'UAE Dirham',
+    'SAR': 'Saudi Riyal',
+    'QAR': 'Qatari Riyal',
+    'KWD': 'Kuwaiti Dinar',
+}
+
+# Unsupported currencies (not in Frankfurter API)
+UNSUPPORTED_CURRENCIES = [
+    'NGN', 'KES', 'UGX', 'TZS', 'GHS', 'RWF', 'ETB', 'MWK',
+    'XOF', 'XAF', 'BWP', 'MZN', 'AOA', 'ZMW', 'MAD', 'TND'
+]
+
+# Essential African currencies that may not be in the API
+ESSENTIAL_AFRICAN_CURRENCIES = [
+    'NGN', 'ZAR', 'EGP', 'MAD', 'TND', 'KES', 'UGX', 'TZS', 'GHS',
+    'XOF', 'XAF', 'BWP', 'MZN', 'AOA', 'ZMW', 'RWF', 'ETB', 'MUR', 'MWK'
+]
+
+# Major world currencies
+MAJOR_CURRENCIES = ['USD', 'EUR', 'GBP', 'JPY', 'CAD', 'AUD', 'CHF', 'CNY', 'INR']
+
+# Offered when the provider's currency list cannot be fetched
+FALLBACK_CURRENCIES = [
+    'USD', 'EUR', 'GBP', 'JPY', 'CAD', 'AUD', 'CHF', 'CNY', 'INR',
+    'NGN', 'ZAR', 'EGP', 'MAD', 'KES', 'GHS', 'UGX', 'TZS'
+]
+
+
+class UnsupportedCurrencyError(ValueError):
+    """The exchange rate provider does not quote this currency"""
+
+    def __init__(self, code):
+        super().__init__(f"{code} is not supported by our exchange rate provider.")
+        self.code = code
+
+
+def load_currencies():
+    """Provider currencies plus essential African and major currencies, sorted.
+
+    Raises when the provider cannot be reached.
+    """
+    # A stale list is served while the refresher revalidates it
+    data = REFRESHER.serve('currencies', lambda: get_provider().currencies())
+    api_currencies = list(data.keys())
+    return sorted(set(api_currencies + ESSENTIAL_AFRICAN_CURRENCIES + MAJOR_CURRENCIES))
+
+
+def fetch_currencies():
+    """Available currencies, or FALLBACK_CURRENCIES if the provider fails"""
+    try:
+        return load_currencies()
+    except Exception as e:
+        logger.warning("Error fetching currencies: %s", e)
+        return list(FALLBACK_CURRENCIES)
+
+
+def fetch_exchange_rate(from_curr, to_curr, amount=1.0):
+    """Fetch exchange rate from Frankfurter API"""
+    if from_curr == to_curr:
+        return {
+            'rate': 1.0,
+            'converted_amount': amount,
+            'error': None,
+            'unsupported': None,
+            'temporarily_unavailable': None
+        }
+
+    # Check for unsupported currencies
+    if from_curr in UNSUPPORTED_CURRENCIES:
+        return {
+            'rate': None,
+            'converted_amount': None,
+            'error': f"{from_curr} is not supported by our exchange rate provider.",
+            'unsupported': from_curr,
+            'temporarily_unavailable': None
+        }
+
+    if to_curr in UNSUPPORTED_CURRENCIES:
+        return {
+            'rate': None,
+            'converted_amount': None,
+            'error': f"{to_curr} is not supported by our exchange rate provider.",
+            'unsupported': to_curr,
+            'temporarily_unavailable': None
+        }
+
+    try:
+        # One base snapshot serves every pair; the rate is triangulated locally
+        table = fetch_rate_table()
+
+        for code in (from_curr, to_curr):
+            if code not in table:
+                return {
+                    'rate': None,
+                    'converted_amount': None,
+                    'error': f"Exchange rate for {code} is not available.",
+                    'unsupported': code,
+                    'temporarily_unavailable': None
+                }
+
+        rate = table.cross(from_curr, to_curr)
+        return {
+            'rate': rate,
+            'converted_amount': amount * rate,
+            'error': None,
+            'unsupported': None,
+            'temporarily_unavailable': None,
+            # The snapshot may be stale while a background refresh runs
+            'as_of': table.date,
+            'fetched_at': datetime.fromtimestamp(table.fetched_at),
+            'age_seconds': table.age()
+        }
+
+    except requests.exceptions.RequestException as e:
+        return {
+            'rate': None,
+            'converted_amount': None,
+            'error': f"Network error: {str(e)}",
+            'unsupported': None,
+            'temporarily_unavailable': from_curr
+        }
+    except Exception as e:
+        return {
+            'rate': None,
+            'converted_amount': None,
+            'error': f"Unexpected error: {str(e)}",
+            'unsupported': None,
+            'temporarily_unavailable': from_curr
+        }
+
+
+def fetch_exchange_rate_on(from_curr, to_curr, day, amount=1.0):
+    """Convert at the last rate published on or before day.
+
+    Weekends and holidays resolve to the previous fixing, reported as
+    'as_of'. Answered from the local history store when it already covers
+    the week before day.
+    """
+    for code in (from_curr, to_curr):
+        if code in UNSUPPORTED_CURRENCIES:
+            return {
+                'rate': None,
+                'converted_amount': None,
+                'error': f"{code} is not supported by our exchange rate provider.",
+                'unsupported': code,
+                'temporarily_unavailable': None
+            }
+
+    try:
+        found = (str(day), 1.0) if from_curr == to_curr else AS_OF_INDEX.rate(from_curr, to_curr, day)
+        if found is None:
+            return {
+                'rate': None,
+                'converted_amount': None,
+                'error': f"No {from_curr}/{to_curr} rate was published on or before {day}.",
+                'unsupported': None,
+                'temporarily_unavailable': None
+            }
+        as_of, rate = found
+        return {
+            'rate': rate,
+            'converted_amount': amount * rate,
+            'error': None,
+            'unsupported': None,
+            'temporarily_unavailable': None,
+            'as_of': as_of
+        }
+
+    except requests.exceptions.RequestException as e:
+        return {
+            'rate': None,
+            'converted_amount': None,
+            'error': f"Network error: {str(e)}",
+            'unsupported': None,
+            'temporarily_unavailable': from_curr
+        }
+    except LookupError:
+        return {
+            'rate': None,
+            'converted_amount': None,
+            'error': f"Historical rates for {from_curr}/{to_curr} are not available.",
+            'unsupported': None,
+            'temporarily_unavailable': None
+        }
+    except Exception as e:
+        return {
+            'rate': None,
+            'converted_amount': None,
+            'error': f"Unexpected error: {str(e)}",
+            'unsupported': None,
+            'temporarily_unavailable': from_curr
+        }
+
+
+def history_window(days=30):
+    """(start, end) ISO dates of the trailing history window"""
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=days)
+    return start_date.strftime('%Y-%m-%d'), end_date.strftime('%Y-%m-%d')
+
+
+def load_rate_series(from_curr, to_curr, days=30, start=None, end=None):
+    """RateSeries for the trailing window, or start..end if given.
+
+    Long ranges are backfilled as concurrent chunks. Raises
+    UnsupportedCurrencyError for currencies the provider lacks and the
+    provider's errors when nothing is stored locally.
+    """
+    for code in (from_curr, to_curr):
+        if code in UNSUPPORTED_CURRENCIES:
+            raise UnsupportedCurrencyError(code)
+
+    if start is None:
+        date_range = history_window(days)
+    else:
+        date_range = (str(start), str(end or datetime.now().strftime('%Y-%m-%d')))
+    # The local store only downloads dates it has not seen yet
+    return REFRESHER.serve(
+        'history', lambda: load_series(from_curr, to_curr, *date_range),
+        pair=(from_curr, to_curr), date_range=date_range
+    )
+
+
+def load_historical_data(from_curr, to_curr, days=30, start=None, end=None):
+    """(dates, rates) lists for the requested window; see load_rate_series"""
+    series = load_rate_series(from_curr, to_curr, days, start, end)
+    return series.dates, series.rates.tolist()
+
+
+def fetch_historical_data(from_curr, to_curr, days=30, start=None, end=None):
+    """(dates, rates) lists for the requested window, or two empty lists"""
+    try:
+        return load_historical_data(from_curr, to_curr, days, start, end)
+    except Exception as e:
+        logger.info("Historical data not available for %s/%s: %s", from_curr, to_curr, e)
+        return [], []
@@ -0,0 +1,91 @@
+"""Point-in-time rates from the local history store.
+
+A conversion "as of" a date uses the last ECB fixing published on or
+before it, so weekends and holidays resolve to the previous business day.
+AsOfIndex keeps one RateSeries per currency against EUR in memory and
+answers with a binary search; the network is only used when the store
+does not yet cover the week before the requested date.
+"""
+import threading
+import time
+from datetime import date, timedelta
+
+import requests
+
+from .history_store import _day, backfill, get_history_store
+from .rate_table import DEFAULT_BASE
+from .schedule import POLL_INTERVAL
+
+# Longest run of days without a fixing (ECB holidays around Christmas and Easter)
+LOOKBACK_DAYS = 7
+# Extra days fetched around a miss, since nearby dates tend to be asked next
+BACKFILL_PAD_DAYS = 31
+
+
+class AsOfIndex:
+    """In-memory as-of lookups over the history store's rates against one base"""
+
+    def __init__(self, store=None, base=DEFAULT_BASE):
+        self.base = base
+        self._store = store
+        self._series = {}  # quote -> ((covered start, covered end), RateSeries, checked_at)
+        self._lock = threading.Lock()
+
+    @property
+    def store(self):
+        return self._store or get_history_store()
+
+    def _covers(self, covered, start, end):
+        return covered is not None and covered[0] <= start and end <= covered[1]
+
+    def series(self, quote, start, end):
+        """Series of base against quote covering start..end, backfilling if needed"""
+        with self._lock:
+            entry = self._series.get(quote)
+        if entry and self._covers(entry[0], start, end):
+            return entry[1]
+        # Today stays uncovered until its fixing is published; recheck at the polling interval
+        if entry and end == date.today() and self._covers(entry[0], start, end - timedelta(days=1)) \
+                and time.monotonic() - entry[2] < POLL_INTERVAL:
+            return entry[1]
+
+        store = self.store
+        if not self._covers(store.coverage(self.base, quote), start, end):
+            pad = timedelta(days=BACKFILL_PAD_DAYS)
+            backfill(store, self.base, quote, start - pad, min(end + pad, date.today()))
+        covered = store.coverage(self.base, quote)
+        if covered is None:
+            raise LookupError(f"No history stored for {self.base}/{quote}")
+        # backfill() keeps what is stored when the upstream fails; an older fixing would be a wrong answer
+        if not self._covers(covered, start, min(end, date.today() - timedelta(days=1))):
+            raise requests.exceptions.ConnectionError(
+                f"Could not fetch {self.base}/{quote} rates for {start}..{end}")
+        series = store.read_series(self.base, quote, *covered)
+        with self._lock:
+            self._series[quote] = (covered, series, time.monotonic())
+        return series
+
+    def fixing(self, quote, day):
+        """(date, rate) of base against quote last published on or before day, or None"""
+        day = min(_day(day), date.today())
+        if quote == self.base:
+            return day.isoformat(), 1.0
+        return self.series(quote, day - timedelta(days=LOOKBACK_DAYS), day).as_of(day)
+
+    def rate(self, from_curr, to_curr, day):
+        """(as-of date, rate) converting from_curr to to_curr, or None if nothing was published.
+
+        The as-of date is the older of the two legs' fixings.
+        """
+        legs = [self.fixing(code, day) for code in (from_curr, to_curr)]
+        if None in legs:
+            return None
+        (from_date, from_rate), (to_date, to_rate) = legs
+        return min(from_date, to_date), to_rate / from_rate
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+AS_OF_INDEX = AsOfIndex()
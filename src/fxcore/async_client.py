@@ -0,0 +1,269 @@
+"""Concurrent provider requests on asyncio.
+
+The Streamlit script itself stays synchronous: prefetch() is a blocking
+wrapper that fires the currency list, latest snapshot and history requests
+in parallel and fills RATE_CACHE and the history store. The existing fetch
+functions then answer from those caches, so a cold page costs the slowest
+single request instead of the sum of all of them.
+
+The Frankfurter provider talks HTTP through AsyncFrankfurterClient (httpx);
+other providers run their synchronous calls on worker threads. prefetch()
+runs on one long-lived event loop, so the provider session and its
+connections are reused across reruns.
+"""
+import asyncio
+import threading
+import time
+
+import httpx
+import requests
+
+from . import budget
+from .budget import BudgetExceededError
+from .frankfurter import API_BASE_URL, CLIENT, RETRY_STATUSES
+from .history_store import get_history_store, merge_ranges, range_rows, record_range, split_range
+from .metrics import (BUDGET_EXHAUSTED, JSON_DECODE_SECONDS, UPSTREAM_BYTES, UPSTREAM_RETRIES, UPSTREAM_SECONDS,
+                      endpoint_label)
+from .providers import get_provider
+from .rate_cache import RATE_CACHE, remembered_error
+from .rate_table import DEFAULT_BASE, RateTable
+from .refresher import REFRESHER
+from .singleflight import AsyncSingleFlight
+
+DEFAULT_TIMEOUT = 15
+MAX_CONNECTIONS = 20
+
+
+class AsyncFrankfurterClient:
+    """Thin async wrapper around one pooled httpx.AsyncClient"""
+
+    def __init__(self, base_url=API_BASE_URL, timeout=DEFAULT_TIMEOUT, max_connections=MAX_CONNECTIONS):
+        self.base_url = base_url
+        self.timeout = timeout
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections)
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self._client.aclose()
+
+    async def get_json(self, url):
+        """GET a URL and decode the JSON body, retrying transient failures like ProviderClient"""
+        # Admission, retry policy, circuit breaker and validators are shared with the synchronous client
+        endpoint = endpoint_label(url)
+        await self._take_token(endpoint, url)
+        with CLIENT.admitted(url):
+            return await self._attempts(url, endpoint)
+
+    async def _take_token(self, endpoint, url):
+        if not CLIENT.take_token(endpoint, url, block=False):
+            # Wait off the event loop; to_thread carries the budget and priority
+            await asyncio.to_thread(CLIENT.take_token, endpoint, url)
+
+    async def _attempts(self, url, endpoint):
+        breaker = CLIENT.breaker
+        for attempt in range(CLIENT.retries + 1):
+            if attempt:
+                await self._take_token(endpoint, url)
+            timeout = budget.timeout_for(self.timeout, url)
+            start = time.perf_counter()
+            try:
+                response = await self._client.get(url, timeout=timeout, headers=CLIENT.validators.headers(url))
+            except httpx.TransportError as e:
+                UPSTREAM_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint, status='error')
+                if isinstance(e, httpx.TimeoutException) and timeout < self.timeout:
+                    BUDGET_EXHAUSTED.inc()
+                    raise BudgetExceededError(f"Rerun time budget spent waiting for {url}") from e
+                error = e
+            else:
+                UPSTREAM_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint, status=str(response.status_code))
+                UPSTREAM_BYTES.inc(len(response.content), endpoint=endpoint)
+                if response.status_code not in RETRY_STATUSES:
+                    break
+                error = httpx.HTTPStatusError(f"{response.status_code} from {url}",
+                                              request=response.request, response=response)
+            delay = CLIENT.retry_delay(attempt)
+            if attempt == CLIENT.retries or delay is None:
+                breaker.record_failure()
+                raise error
+            UPSTREAM_RETRIES.inc(endpoint=endpoint)
+            await asyncio.sleep(delay)
+
+        # The upstream answered; client errors such as 404 are not outages
+        breaker.record_success()
+        if response.status_code == 304:
+            return CLIENT.validators.body(url)
+        response.raise_for_status()
+        with JSON_DECODE_SECONDS.time(endpoint=endpoint):
+            body = response.json()
+        CLIENT.validators.store(url, response.headers, body)
+        return body
+
+    async def currencies(self):
+        return await self.get_json(f"{self.base_url}/currencies")
+
+    async def latest(self, base=DEFAULT_BASE):
+        return await self.get_json(f"{self.base_url}/latest?from={base}")
+
+    async def history(self, base, quote, start, end):
+        return await self.get_json(f"{self.base_url}/{start}..{end}?from={base}&to={quote}")
+
+
+def _remember_failure(error, endpoint, pair=None, date_range=None):
+    # Stored as a requests error so the synchronous fetch functions report it as usual
+    if isinstance(error, httpx.HTTPStatusError):
+        error = requests.exceptions.HTTPError(str(error))
+    elif isinstance(error, httpx.HTTPError):
+        error = requests.exceptions.ConnectionError(str(error))
+    if remembered_error(error):
+        RATE_CACHE.remember_failure(endpoint, error, pair, date_range)
+
+
+async def _cache_currencies(client):
+    try:
+        RATE_CACHE.set('currencies', await client.currencies())
+    except Exception as e:
+        _remember_failure(e, 'currencies')
+        raise
+
+
+async def _cache_latest(client, base):
+    try:
+        RATE_CACHE.set('latest', RateTable.from_response(await client.latest(base)), pair=base)
+    except Exception as e:
+        _remember_failure(e, 'latest', pair=base)
+        raise
+
+
+async def _cache_history(client, base, quote, date_range):
+    # Backfill only the part of the window the history store lacks
+    store = get_history_store()
+    for fetch_start, fetch_end in store.missing_ranges(base, quote, *date_range):
+        # Long ranges go out as concurrent chunks and are merged in order
+        try:
+            data = merge_ranges(await asyncio.gather(*(
+                client.history(base, quote, s.isoformat(), e.isoformat())
+                for s, e in split_range(fetch_start, fetch_end)
+            )))
+        except Exception as e:
+            # With rows already stored the synchronous path still answers locally
+            if store.coverage(base, quote) is None:
+                _remember_failure(e, 'history', (base, quote), date_range)
+            raise
+        record_range(store, base, quote, fetch_start, fetch_end, range_rows(data, quote))
+    RATE_CACHE.set('history', store.read_series(base, quote, *date_range), pair=(base, quote), date_range=date_range)
+
+
+# Shared by every prefetch on the same event loop
+PREFETCH_FLIGHT = AsyncSingleFlight()
+
+
+def _needs_fetch(key):
+    """Whether prefetch should fetch a key in this rerun"""
+    # Keys that recently failed are left to the fetch functions, which fail fast on them
+    if RATE_CACHE.contains(*key) or RATE_CACHE.failure(*key):
+        return False
+    if RATE_CACHE.get_stale(*key)[0]:
+        # The fetch functions serve the stale value while the refresher revalidates it
+        REFRESHER.revalidate(key)
+        return False
+    return True
+
+
+async def prefetch_async(pairs=(), date_range=None, currencies=True, latest=True, base=DEFAULT_BASE,
+                         client=None):
+    """Warm the caches for a page in parallel, fanning out over history pairs.
+
+    Only entries RATE_CACHE does not hold at all and that did not recently
+    fail are requested; stale entries are handed to the background
+    refresher. No client is opened when there is nothing to fetch.
+    Failures are remembered in RATE_CACHE like those of the synchronous
+    fetch functions. Returns the exceptions raised by individual requests;
+    callers fall back to the synchronous fetch functions, which report
+    errors as before. Requests for a key another prefetch on the same
+    loop is already fetching wait for that one. Without client, a provider
+    session is opened for this call only.
+    """
+    jobs = {}  # cache key -> job
+    key = ('currencies', None, None)
+    if currencies and _needs_fetch(key):
+        jobs[key] = _cache_currencies
+    key = ('latest', base, None)
+    if latest and _needs_fetch(key):
+        jobs[key] = lambda client: _cache_latest(client, base)
+    if date_range is not None:
+        date_range = tuple(date_range)
+        for b, q in pairs:
+            key = ('history', (b, q), date_range)
+            if _needs_fetch(key):
+                jobs[key] = lambda client, b=b, q=q: _cache_history(client, b, q, date_range)
+    if not jobs:
+        return []
+
+    async def run(client):
+        # Concurrent prefetches of the same key share one request
+        return await asyncio.gather(*(
+            PREFETCH_FLIGHT.do(key, lambda job=job: job(client)) for key, job in jobs.items()
+        ), return_exceptions=True)
+
+    if client is None:
+        async with get_provider().async_session() as client:
+            results = await run(client)
+    else:
+        results = await run(client)
+    return [r for r in results if isinstance(r, Exception)]
+
+
+class PrefetchLoop:
+    """Event loop on a daemon thread whose provider session stays open between reruns.
+
+    An httpx client belongs to the loop it was opened on, so prefetching
+    through one long-lived loop keeps its connections alive from rerun to
+    rerun instead of reconnecting on every page.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._lock = threading.Lock()
+        self._session = None  # (provider, open session), only touched on the loop thread
+
+    def _running_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name='fx-prefetch', daemon=True).start()
+            return self._loop
+
+    async def session(self):
+        """Open session of the current provider, replacing one left by a previous provider"""
+        provider = get_provider()
+        if self._session is None or self._session[0] is not provider:
+            if self._session is not None:
+                await self._session[1].__aexit__(None, None, None)
+            session = provider.async_session()
+            self._session = (provider, await session.__aenter__())
+        return self._session[1]
+
+    def run(self, coro_fn):
+        """Run coro_fn(session) on the loop and wait for its result.
+
+        The task runs in a copy of the caller's context, so the rerun's
+        upstream budget and request priority apply.
+        """
+        async def main():
+            return await coro_fn(await self.session())
+
+        return asyncio.run_coroutine_threadsafe(main(), self._running_loop()).result()
+
+
+# Shared by all sessions served by this process
+PREFETCH_LOOP = PrefetchLoop()
+
+
+def prefetch(pairs=(), date_range=None, currencies=True, latest=True, base=DEFAULT_BASE):
+    """Blocking wrapper around prefetch_async, run on PREFETCH_LOOP"""
+    return PREFETCH_LOOP.run(lambda client: prefetch_async(pairs, date_range, currencies, latest, base, client))
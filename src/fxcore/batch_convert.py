@@ -0,0 +1,166 @@
+"""Headless batch converter for large transaction files.
+
+Reads a CSV or Parquet file in fixed-size chunks, converts every row at the
+rate published for its value date and streams the results to the output
+file. Each value date is fetched once per run as a full base snapshot, so
+all pairs on that date are priced from memory.
+
+    cd src && python -m fxcore.batch_convert transactions.csv revalued.csv --chunk-size 50000
+
+Parquet input or output requires pyarrow.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import requests
+
+from .cross_matrix import CrossRateMatrix, convert_many
+from .rate_table import fetch_rate_table, fetch_rate_table_on
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def _is_parquet(path):
+    return os.path.splitext(path)[1].lower() in ('.parquet', '.pq')
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit("Parquet files require pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def read_chunks(path, chunk_size):
+    """Yield DataFrames of at most chunk_size rows"""
+    if _is_parquet(path):
+        pa = _require_pyarrow()
+        for batch in pa.parquet.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype={'from': str, 'to': str})
+
+
+class ChunkWriter:
+    """Append converted chunks to a CSV or Parquet file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._parquet = None
+        self._first = True
+
+    def write(self, frame):
+        if _is_parquet(self.path):
+            pa = _require_pyarrow()
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if self._parquet is None:
+                self._parquet = pa.parquet.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            frame.to_csv(self.path, mode='w' if self._first else 'a', header=self._first, index=False)
+        self._first = False
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+class DatedMatrices:
+    """One cross-rate matrix per value date, fetched at most once per run"""
+
+    def __init__(self):
+        self._matrices = {}
+        self.fetches = 0
+
+    def get(self, day):
+        """Matrix for a date (None means latest), or None if it cannot be fetched"""
+        if day not in self._matrices:
+            self.fetches += 1
+            try:
+                table = fetch_rate_table() if day is None else fetch_rate_table_on(day)
+                self._matrices[day] = CrossRateMatrix.from_table(table)
+            except requests.exceptions.RequestException:
+                self._matrices[day] = None
+        return self._matrices[day]
+
+
+def convert_chunk(frame, matrices, amount_col='amount', from_col='from', to_col='to', date_col='date'):
+    """Add rate, converted_amount, rate_date and error columns to a chunk"""
+    n = len(frame)
+    amounts = pd.to_numeric(frame[amount_col], errors='coerce').to_numpy(dtype=np.float64)
+    from_codes = frame[from_col].astype(str).str.strip().str.upper().to_numpy()
+    to_codes = frame[to_col].astype(str).str.strip().str.upper().to_numpy()
+
+    if date_col in frame:
+        days = pd.to_datetime(frame[date_col], errors='coerce', format='ISO8601').dt.strftime('%Y-%m-%d')
+        invalid_date = days.isna().to_numpy()
+        days = days.fillna('').to_numpy()
+    else:
+        days = np.full(n, '', dtype=object)
+        invalid_date = np.zeros(n, dtype=bool)
+
+    # Amounts that are missing or not numbers are flagged instead of priced
+    invalid_amount = np.isnan(amounts)
+    invalid = invalid_date | invalid_amount
+
+    rates = np.full(n, np.nan)
+    rate_dates = np.full(n, None, dtype=object)
+    errors = np.where(invalid_date, 'invalid_date', '').astype(object)
+    errors[invalid_amount & ~invalid_date] = 'invalid_amount'
+
+    # Group rows by value date so every date is priced from one snapshot
+    for day in np.unique(days[~invalid]):
+        rows = np.flatnonzero((days == day) & ~invalid)
+        matrix = matrices.get(day or None)
+        if matrix is None:
+            errors[rows] = 'unavailable'
+            continue
+        result = convert_many(amounts[rows], from_codes[rows], to_codes[rows], matrix=matrix)
+        rates[rows] = result['rate']
+        rate_dates[rows] = matrix.date
+        errors[rows[result['unsupported']]] = 'unsupported'
+
+    out = frame.copy()
+    out['rate'] = rates
+    out['converted_amount'] = amounts * rates
+    out['rate_date'] = rate_dates
+    out['error'] = errors
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a CSV or Parquet file of transactions")
+    parser.add_argument('input', help="CSV or Parquet file with amount, from, to and date columns")
+    parser.add_argument('output', help="CSV or Parquet file to write")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--amount-col', default='amount')
+    parser.add_argument('--from-col', default='from')
+    parser.add_argument('--to-col', default='to')
+    parser.add_argument('--date-col', default='date',
+                        help="value date column; without it every row uses the latest rates")
+    args = parser.parse_args(argv)
+
+    matrices = DatedMatrices()
+    writer = ChunkWriter(args.output)
+    total = failed = 0
+    try:
+        for chunk in read_chunks(args.input, args.chunk_size):
+            out = convert_chunk(chunk, matrices, args.amount_col, args.from_col, args.to_col, args.date_col)
+            writer.write(out)
+            total += len(out)
+            failed += int((out['error'] != '').sum())
+    finally:
+        writer.close()
+
+    print(f"Converted {total} rows ({failed} with errors) using {matrices.fetches} rate snapshots",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""Time budget shared by every upstream call made for one page render.
+
+upstream_budget() sets a deadline in a context variable. Provider calls
+made inside it shorten their timeouts to the time left and fail fast with
+BudgetExceededError once it is spent, so one slow upstream cannot hold a
+rerun for the sum of every request's timeout. Calls outside a budget,
+such as background refreshes, keep their own timeouts.
+"""
+import contextvars
+import os
+import time
+from contextlib import contextmanager
+
+import requests
+
+from .metrics import BUDGET_EXHAUSTED
+
+# Seconds of upstream time allowed per rerun of the Streamlit script
+DEFAULT_BUDGET = float(os.environ.get('FX_RERUN_BUDGET', 5.0))
+
+_deadline = contextvars.ContextVar('fx_upstream_deadline', default=None)
+
+
+class BudgetExceededError(requests.exceptions.Timeout):
+    """The rerun's upstream time budget ran out before or during a call.
+
+    skipped is True when the call was never started, which says nothing
+    about the upstream's health.
+    """
+
+    def __init__(self, *args, skipped=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.skipped = skipped
+
+
+@contextmanager
+def upstream_budget(seconds=DEFAULT_BUDGET):
+    """Limit the upstream time of calls made inside the block to seconds.
+
+    A nested budget never extends the deadline of the one enclosing it.
+    """
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(deadline, outer))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    """Seconds left in the current budget, or None outside one"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def timeout_for(timeout, what="upstream call"):
+    """timeout capped by the current budget; raises once the budget is spent"""
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        BUDGET_EXHAUSTED.inc()
+        raise BudgetExceededError(f"Rerun time budget spent, not starting {what}", skipped=True)
+    return min(timeout, left)
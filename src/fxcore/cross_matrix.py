@@ -0,0 +1,121 @@
+"""Vectorized N x N cross-rate matrix built from one base snapshot"""
+import threading
+
+import numpy as np
+import requests
+
+from .api import UNSUPPORTED_CURRENCIES
+from .rate_table import fetch_rate_table
+
+
+class CrossRateMatrix:
+    """Every pair of a currency list, computed with one outer division.
+
+    matrix[i, j] holds units of codes[j] per one codes[i]. Currencies the
+    snapshot does not quote get NaN rows and columns, except on the
+    diagonal which is always 1.0.
+    """
+
+    def __init__(self, codes, base_rates, date=None):
+        self.codes = list(codes)
+        self.index = {code: i for i, code in enumerate(self.codes)}
+        self.date = date
+        self.base_rates = np.asarray(base_rates, dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # divide.outer gives v[i] / v[j]; transpose to get rate from i to j
+            self.matrix = np.divide.outer(self.base_rates, self.base_rates).T
+        np.fill_diagonal(self.matrix, 1.0)
+        self.matrix.setflags(write=False)
+
+    @classmethod
+    def from_table(cls, table, codes=None):
+        """Matrix over codes (default: every currency in the table)"""
+        codes = table.currencies() if codes is None else list(codes)
+        base_rates = [table.rates.get(code, np.nan) for code in codes]
+        return cls(codes, base_rates, date=table.date)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __contains__(self, code):
+        return code in self.index
+
+    def index_of(self, code):
+        """Position of a currency code, or -1 if it is not in the matrix"""
+        return self.index.get(code, -1)
+
+    def rate(self, from_curr, to_curr):
+        """Units of to_curr per one from_curr, or None if not quoted"""
+        i, j = self.index.get(from_curr), self.index.get(to_curr)
+        if i is None or j is None:
+            return None
+        rate = self.matrix[i, j]
+        return None if np.isnan(rate) else float(rate)
+
+    def row(self, from_curr):
+        """Rates from one currency into every currency (read-only view)"""
+        return self.matrix[self.index[from_curr]]
+
+    def column(self, to_curr):
+        """Rates from every currency into one currency (read-only view)"""
+        return self.matrix[:, self.index[to_curr]]
+
+
+_build_lock = threading.Lock()
+
+
+def fetch_cross_matrix(codes=None):
+    """Cross-rate matrix for the latest snapshot, built once per snapshot and code list"""
+    table = fetch_rate_table()
+    key = None if codes is None else tuple(codes)
+    with _build_lock:
+        if ('matrix', key) not in table.derived:
+            table.derived['matrix', key] = CrossRateMatrix.from_table(table, key)
+        return table.derived['matrix', key]
+
+
+def convert_many(amounts, from_codes, to_codes, matrix=None):
+    """Convert arrays of amounts between arrays of currency codes.
+
+    Each distinct code is resolved to a matrix index once and every row is
+    then priced with a single vectorized gather. Returns columns matching
+    the scalar fetch_exchange_rate result: 'rate' and 'converted_amount'
+    (NaN on error rows) plus boolean masks 'unsupported', 'unavailable'
+    and 'error'. Rows converting a currency to itself always succeed.
+    """
+    amounts = np.asarray(amounts, dtype=np.float64)
+    from_codes = np.asarray(from_codes).astype(str)
+    to_codes = np.asarray(to_codes).astype(str)
+    n = len(amounts)
+    if not (len(from_codes) == len(to_codes) == n):
+        raise ValueError("amounts, from_codes and to_codes must have the same length")
+
+    same = from_codes == to_codes
+    rates = np.where(same, 1.0, np.nan)
+    # Like the scalar path, listed currencies are unsupported whether or not a snapshot is at hand
+    listed = (np.isin(from_codes, UNSUPPORTED_CURRENCIES) | np.isin(to_codes, UNSUPPORTED_CURRENCIES)) & ~same
+    unavailable = np.zeros(n, dtype=bool)
+
+    if matrix is None:
+        try:
+            matrix = fetch_cross_matrix()
+        except requests.exceptions.RequestException:
+            matrix = None
+
+    if matrix is None:
+        unavailable = ~same & ~listed
+    elif n:
+        codes, inverse = np.unique(np.concatenate([from_codes, to_codes]), return_inverse=True)
+        positions = np.array([matrix.index_of(code) for code in codes], dtype=np.intp)[inverse]
+        from_idx, to_idx = positions[:n], positions[n:]
+        known = (from_idx >= 0) & (to_idx >= 0) & ~same & ~listed
+        rates[known] = matrix.matrix[from_idx[known], to_idx[known]]
+
+    unsupported = np.isnan(rates) & ~unavailable
+    return {
+        'rate': rates,
+        'converted_amount': amounts * rates,
+        'unsupported': unsupported,
+        'unavailable': unavailable,
+        'error': unsupported | unavailable,
+    }
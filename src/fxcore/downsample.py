@@ -0,0 +1,36 @@
+"""Shape-preserving downsampling for charts"""
+import numpy as np
+
+# About one point per horizontal pixel of a half-width chart
+MAX_CHART_POINTS = 600
+
+
+def lttb(x, y, threshold=MAX_CHART_POINTS):
+    """Indices of the points kept by Largest-Triangle-Three-Buckets.
+
+    Keeps the first and last points and, from each of threshold - 2 equal
+    buckets, the point forming the largest triangle with the previously
+    kept point and the next bucket's average. Peaks and troughs survive
+    where plain striding would drop them.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    keep = np.empty(threshold, dtype=np.intp)
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[stop:next_stop].mean() if next_stop > stop else x[-1]
+        avg_y = y[stop:next_stop].mean() if next_stop > stop else y[-1]
+        bx, by = x[start:stop], y[start:stop]
+        areas = np.abs((x[previous] - avg_x) * (by - y[previous]) - (x[previous] - bx) * (avg_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        keep[i + 1] = previous
+    return keep
+
@@ -0,0 +1,260 @@
+"""HTTP access to the Frankfurter API.
+
+All synchronous requests go through one ProviderClient, which keeps a pooled
+keep-alive session, coalesces concurrent identical requests, retries
+transient failures with jittered backoff and fails fast through a circuit
+breaker while the upstream is unhealthy. Every attempt first waits for a
+token from the shared rate limiter. Timeouts and retries stay within
+the caller's upstream_budget(). Polled endpoints are revalidated with
+conditional requests, so an unchanged answer costs a 304.
+"""
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import budget, ratelimit
+from .budget import BudgetExceededError
+from .metrics import (BUDGET_EXHAUSTED, JSON_DECODE_SECONDS, REGISTRY, UPSTREAM_BYTES, UPSTREAM_RETRIES,
+                     UPSTREAM_SECONDS, endpoint_label)
+from .singleflight import SingleFlight
+
+API_BASE_URL = os.environ.get('FX_API_BASE_URL', "https://api.frankfurter.app")
+
+# Responses worth retrying; other 4xx answers are final
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Endpoints polled for changes, whose bodies are kept for conditional requests
+CONDITIONAL_ENDPOINTS = {'latest', 'currencies'}
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised without contacting the upstream while the circuit is open"""
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures and lets one probe through after reset_timeout"""
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return 'half_open'
+            return 'open'
+
+    def allow(self):
+        """Whether a request may be sent now"""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def release_probe(self):
+        """End a probe that finished without a verdict, so the next call may probe"""
+        with self._lock:
+            self._probing = False
+
+
+class Validators:
+    """ETag/Last-Modified and decoded body of recent responses, per URL"""
+
+    def __init__(self, max_entries=64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # url -> (etag, last_modified, body)
+        self._lock = threading.Lock()
+        self.not_modified = 0
+
+    def headers(self, url):
+        """Conditional request headers for a URL, empty if nothing is held"""
+        if endpoint_label(url) not in CONDITIONAL_ENDPOINTS:
+            return {}
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is None:
+            return {}
+        etag, last_modified, _ = entry
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def store(self, url, headers, body):
+        """Keep a response's validators, if it has any"""
+        etag, last_modified = headers.get('ETag'), headers.get('Last-Modified')
+        if endpoint_label(url) not in CONDITIONAL_ENDPOINTS or not (etag or last_modified):
+            return
+        with self._lock:
+            self._entries.pop(url, None)
+            self._entries[url] = (etag, last_modified, body)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def body(self, url):
+        """Body previously served for a URL, confirmed by a 304"""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                raise requests.exceptions.HTTPError(f"304 Not Modified for {url} without a stored body")
+            self.not_modified += 1
+            return entry[2]
+
+
+class ProviderClient:
+    """Pooled session with bounded retries and a circuit breaker"""
+
+    def __init__(self, pool_size=20, retries=2, backoff=0.25, max_backoff=2.0, breaker=None):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.validators = Validators()
+        self.flight = SingleFlight()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def retry_delay(self, attempt):
+        """Seconds to back off after a failed attempt, or None when the rerun budget leaves no time to retry"""
+        # Full jitter keeps concurrent sessions from retrying in lockstep
+        delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+        left = budget.remaining()
+        if left is not None and delay >= left:
+            BUDGET_EXHAUSTED.inc()
+            return None
+        return delay
+
+    def _sleep_before_retry(self, attempt):
+        """Back off before a retry; False when the rerun budget leaves no time for one"""
+        delay = self.retry_delay(attempt)
+        if delay is None:
+            return False
+        time.sleep(delay)
+        return True
+
+    def get_json(self, url, timeout):
+        """GET a URL and decode the JSON body, retrying transient failures.
+
+        Concurrent requests for the same URL share one upstream call.
+        """
+        return self.flight.do(url, lambda: self._get_json(url, timeout))
+
+    def take_token(self, endpoint, url, block=True):
+        """Take a rate limit token for a call to url, unless the circuit is open.
+
+        With block false only a free token is taken; returns whether one was.
+        """
+        # Calls refused by an open circuit fail fast in admitted() without queueing
+        if self.breaker.state == 'open':
+            return True
+        if not block:
+            return ratelimit.LIMITER.try_acquire(ratelimit.current_priority(endpoint))
+        ratelimit.wait_for_token(endpoint, url)
+        return True
+
+    @contextmanager
+    def admitted(self, url):
+        """Let one call to url through the circuit breaker, releasing a half-open probe on exit.
+
+        Callers take the call's token first, so a probe never waits in the limiter queue.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Exchange rate provider unavailable, not calling {url}")
+        try:
+            yield
+        finally:
+            # A call cut short by the budget says nothing either way; don't let it hold the probe
+            self.breaker.release_probe()
+
+    def _get_json(self, url, timeout):
+        endpoint = endpoint_label(url)
+        self.take_token(endpoint, url)
+        with self.admitted(url):
+            return self._attempts(url, endpoint, timeout)
+
+    def _attempts(self, url, endpoint, timeout):
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.take_token(endpoint, url)
+            # Never wait longer than the rerun's remaining budget
+            attempt_timeout = budget.timeout_for(timeout, url)
+            start = time.perf_counter()
+            status = 'error'
+            try:
+                response = self.session.get(url, timeout=attempt_timeout, headers=self.validators.headers(url))
+                status = str(response.status_code)
+                UPSTREAM_BYTES.inc(len(response.content), endpoint=endpoint)
+                if response.status_code in RETRY_STATUSES:
+                    response.raise_for_status()
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout,
+                    requests.exceptions.HTTPError) as e:
+                if isinstance(e, requests.exceptions.Timeout) and attempt_timeout < timeout:
+                    # Cut short by the budget, which says nothing about the upstream's health
+                    BUDGET_EXHAUSTED.inc()
+                    raise BudgetExceededError(f"Rerun time budget spent waiting for {url}") from e
+                if attempt == self.retries or not self._sleep_before_retry(attempt):
+                    self.breaker.record_failure()
+                    raise
+                UPSTREAM_RETRIES.inc(endpoint=endpoint)
+                continue
+            finally:
+                UPSTREAM_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint, status=status)
+
+            # The upstream answered; client errors such as 404 are not outages
+            self.breaker.record_success()
+            if response.status_code == 304:
+                return self.validators.body(url)
+            response.raise_for_status()
+            with JSON_DECODE_SECONDS.time(endpoint=endpoint):
+                body = response.json()
+            self.validators.store(url, response.headers, body)
+            return body
+
+
+# Shared by all sessions served by this process
+CLIENT = ProviderClient()
+
+
+REGISTRY.add_collector(lambda: [(
+    'fx_circuit_open', 'gauge', "1 while the upstream circuit breaker is open",
+    [({}, 0 if CLIENT.breaker.state == 'closed' else 1)]
+)])
+
+
+def get_json(url, timeout):
+    """GET a Frankfurter URL and decode the JSON body"""
+    return CLIENT.get_json(url, timeout)
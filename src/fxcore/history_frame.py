@@ -0,0 +1,92 @@
+"""Columnar history for one base currency against many quotes"""
+import numpy as np
+
+from .api import UNSUPPORTED_CURRENCIES, history_window
+from .downsample import lttb
+from .history_store import load_history_multi
+from .refresher import REFRESHER
+from .rolling import DEFAULT_WINDOW, rolling_stats
+
+
+class HistoryFrame:
+    """Shared date index with one float64 array per quote (NaN where missing)"""
+
+    def __init__(self, base, dates, columns, unsupported=()):
+        self.base = base
+        self.dates = list(dates)
+        self.columns = dict(columns)
+        self.unsupported = list(unsupported)
+
+    @classmethod
+    def from_rows(cls, base, rows_by_quote, unsupported=()):
+        """Align {quote: [(date, rate), ...]} on the union of their dates"""
+        dates = sorted({day for rows in rows_by_quote.values() for day, _ in rows})
+        position = {day: i for i, day in enumerate(dates)}
+        columns = {}
+        for quote, rows in rows_by_quote.items():
+            column = np.full(len(dates), np.nan)
+            if rows:
+                column[[position[day] for day, _ in rows]] = [rate for _, rate in rows]
+            columns[quote] = column
+        return cls(base, dates, columns, unsupported)
+
+    @property
+    def quotes(self):
+        return list(self.columns)
+
+    def __len__(self):
+        return len(self.dates)
+
+    def rebased(self, level=100.0):
+        """Columns scaled so each starts at level, for comparing different magnitudes"""
+        rebased = {}
+        for quote, column in self.columns.items():
+            valid = column[~np.isnan(column)]
+            rebased[quote] = column / valid[0] * level if len(valid) else column
+        return rebased
+
+    def downsample(self, threshold):
+        """Frame on a shared subset of about threshold dates, keeping every quote's peaks and troughs.
+
+        Each quote picks an equal share of the dates with LTTB over its own
+        fixings; the frame keeps the union of those picks.
+        """
+        if len(self) <= threshold or not self.columns:
+            return self
+        x = np.array(self.dates, dtype='datetime64[D]').astype(np.int64)
+        share = max(3, threshold // len(self.columns))
+        keep = set()
+        for column in self.columns.values():
+            valid = np.flatnonzero(~np.isnan(column))
+            keep.update(valid[lttb(x[valid], column[valid], share)].tolist())
+        keep = np.array(sorted(keep), dtype=np.intp)
+        return HistoryFrame(self.base, [self.dates[i] for i in keep],
+                            {quote: column[keep] for quote, column in self.columns.items()}, self.unsupported)
+
+    def rolling(self, window=DEFAULT_WINDOW):
+        """Rolling statistics for every date, one column per quote in quotes order"""
+        values = np.column_stack([self.columns[q] for q in self.quotes]) if self.columns else np.empty((0, 0))
+        return rolling_stats(self.dates, values, window)
+
+
+def fetch_history_frame(base, quotes, days=30):
+    """History of base against every quote in one request per missing range.
+
+    Quotes equal to base or unsupported by the provider are left out and
+    listed in the frame's unsupported attribute.
+    """
+    quotes = [q for q in dict.fromkeys(quotes) if q != base]
+    if base in UNSUPPORTED_CURRENCIES:
+        return HistoryFrame(base, [], {}, unsupported=[base])
+    unsupported = [q for q in quotes if q in UNSUPPORTED_CURRENCIES]
+    quotes = [q for q in quotes if q not in unsupported]
+    if not quotes:
+        return HistoryFrame(base, [], {}, unsupported)
+
+    date_range = history_window(days)
+    # Cached as float64 columns, a fraction of the size of the stored rows
+    frame = REFRESHER.serve(
+        'history', lambda: HistoryFrame.from_rows(base, load_history_multi(base, quotes, *date_range)),
+        pair=(base, tuple(quotes)), date_range=date_range
+    )
+    return HistoryFrame(base, frame.dates, frame.columns, unsupported)
@@ -0,0 +1,273 @@
+"""Durable local store for daily exchange rates with incremental backfill.
+
+Rates are kept in SQLite, indexed by (base, quote, date), together with the
+contiguous date range already fetched for each pair. A history request only
+downloads the dates outside that range and reads everything else locally.
+"""
+import contextvars
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import requests
+
+from .providers import get_provider
+
+# Long ranges are fetched as concurrent requests of at most this many days
+CHUNK_DAYS = 365
+MAX_CHUNK_WORKERS = 4
+
+DEFAULT_PATH = os.path.expanduser(os.environ.get(
+    'FX_HISTORY_DB', os.path.join('~', '.cache', 'currency-exchange', 'history.sqlite3')
+))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rates (
+    base TEXT NOT NULL,
+    quote TEXT NOT NULL,
+    date TEXT NOT NULL,
+    rate REAL NOT NULL,
+    PRIMARY KEY (base, quote, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    base TEXT NOT NULL,
+    quote TEXT NOT NULL,
+    start TEXT NOT NULL,
+    end TEXT NOT NULL,
+    PRIMARY KEY (base, quote)
+) WITHOUT ROWID;
+"""
+
+
+def _day(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+class HistoryStore:
+    """SQLite-backed daily rates with the fetched date range per pair"""
+
+    def __init__(self, path=DEFAULT_PATH):
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock:
+            if path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(SCHEMA)
+
+    def coverage(self, base, quote):
+        """(start, end) dates already fetched for a pair, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT start, end FROM coverage WHERE base = ? AND quote = ?',
+                (base, quote)
+            ).fetchone()
+        return (date.fromisoformat(row[0]), date.fromisoformat(row[1])) if row else None
+
+    def missing_ranges(self, base, quote, start, end):
+        """Date ranges that must be fetched to cover start..end.
+
+        Gaps between the requested window and the stored range are included
+        so each pair's coverage stays a single contiguous interval.
+        """
+        start, end = _day(start), _day(end)
+        covered = self.coverage(base, quote)
+        if covered is None:
+            return [(start, end)]
+        cov_start, cov_end = covered
+        missing = []
+        if start < cov_start:
+            missing.append((start, cov_start - timedelta(days=1)))
+        if end > cov_end:
+            missing.append((cov_end + timedelta(days=1), end))
+        return missing
+
+    def pairs(self):
+        """(base, quote, start, end) for every pair with stored coverage"""
+        with self._lock:
+            rows = self._conn.execute('SELECT base, quote, start, end FROM coverage ORDER BY base, quote').fetchall()
+        return [(base, quote, date.fromisoformat(start), date.fromisoformat(end)) for base, quote, start, end in rows]
+
+    def write(self, base, quote, rows, start, end):
+        """Insert (date, rate) rows and extend the pair's coverage to start..end"""
+        start, end = _day(start), _day(end)
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO rates (base, quote, date, rate) VALUES (?, ?, ?, ?)',
+                [(base, quote, d, r) for d, r in rows]
+            )
+            row = self._conn.execute(
+                'SELECT start, end FROM coverage WHERE base = ? AND quote = ?',
+                (base, quote)
+            ).fetchone()
+            if row:
+                start = min(start, date.fromisoformat(row[0]))
+                end = max(end, date.fromisoformat(row[1]))
+            self._conn.execute(
+                'INSERT OR REPLACE INTO coverage (base, quote, start, end) VALUES (?, ?, ?, ?)',
+                (base, quote, start.isoformat(), end.isoformat())
+            )
+
+    def read(self, base, quote, start, end):
+        """Stored (date, rate) rows for a pair between start and end, oldest first"""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT date, rate FROM rates WHERE base = ? AND quote = ? '
+                'AND date BETWEEN ? AND ? ORDER BY date',
+                (base, quote, _day(start).isoformat(), _day(end).isoformat())
+            ).fetchall()
+
+    def read_series(self, base, quote, start, end):
+        """Stored fixings between start and end as a RateSeries, without row tuples"""
+        # Deferred so importing the fetch functions does not load NumPy
+        import numpy as np
+        from .series import RateSeries
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT CAST(julianday(date) - julianday('1970-01-01') AS INTEGER), rate "
+                'FROM rates WHERE base = ? AND quote = ? AND date BETWEEN ? AND ? ORDER BY date',
+                (base, quote, _day(start).isoformat(), _day(end).isoformat())
+            )
+            rows = np.fromiter(cursor, dtype=[('day', np.int32), ('rate', np.float64)])
+        return RateSeries(rows['day'], rows['rate'])
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_history_store():
+    """Process-wide HistoryStore, opened on first use"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = HistoryStore()
+        return _store
+
+
+def set_history_store(store):
+    """Swap the process-wide HistoryStore, returning the previous one"""
+    global _store
+    with _store_lock:
+        previous, _store = _store, store
+    return previous
+
+
+def split_range(start, end, chunk_days=CHUNK_DAYS):
+    """Consecutive (start, end) chunks of at most chunk_days covering start..end"""
+    chunks = []
+    while start <= end:
+        chunk_end = min(end, start + timedelta(days=chunk_days - 1))
+        chunks.append((start, chunk_end))
+        start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def merge_ranges(responses):
+    """Combine range responses for consecutive chunks into one response"""
+    rates = {}
+    for data in responses:
+        rates.update(data['rates'])
+    return {'rates': dict(sorted(rates.items()))}
+
+
+def fetch_range(base, quotes, start, end):
+    """Range response for start..end, fetching long ranges in parallel chunks.
+
+    Raises if any chunk fails, so callers never record a partial range.
+    """
+    chunks = split_range(start, end)
+    provider = get_provider()
+    if len(chunks) == 1:
+        return provider.history(base, quotes, start.isoformat(), end.isoformat())
+    with ThreadPoolExecutor(max_workers=min(MAX_CHUNK_WORKERS, len(chunks))) as pool:
+        # Each chunk runs in a copy of this context so the rerun's upstream budget applies
+        futures = [
+            pool.submit(contextvars.copy_context().run, provider.history, base, quotes, s.isoformat(), e.isoformat())
+            for s, e in chunks
+        ]
+        return merge_ranges([f.result() for f in futures])
+
+
+def range_rows(data, quote):
+    """(date, rate) rows for one quote from a range response, oldest first"""
+    return [(d, rates[quote]) for d, rates in sorted(data['rates'].items()) if quote in rates]
+
+
+def record_range(store, base, quote, fetch_start, fetch_end, rows):
+    """Store rows fetched for fetch_start..fetch_end and mark the final part covered.
+
+    Ranges reaching today are only marked as covered up to the last published
+    fixing (or yesterday), so today's rate is picked up once it appears.
+    """
+    today = date.today()
+    covered_end = fetch_end
+    if fetch_end >= today:
+        last_published = date.fromisoformat(rows[-1][0]) if rows else None
+        covered_end = today - timedelta(days=1)
+        if last_published and last_published > covered_end:
+            covered_end = last_published
+    if covered_end >= fetch_start:
+        store.write(base, quote, rows, fetch_start, covered_end)
+
+
+def backfill(store, base, quote, start, end):
+    """Fetch and store whatever part of start..end the store lacks for a pair.
+
+    Network errors are raised only when nothing is stored for the pair.
+    """
+    for fetch_start, fetch_end in store.missing_ranges(base, quote, start, end):
+        try:
+            data = fetch_range(base, quote, fetch_start, fetch_end)
+        except requests.exceptions.RequestException:
+            if store.coverage(base, quote) is None:
+                raise
+            break
+        record_range(store, base, quote, fetch_start, fetch_end, range_rows(data, quote))
+
+
+def load_history(base, quote, start, end, store=None):
+    """Daily (date, rate) rows for start..end, fetching only what the store lacks"""
+    store = store or get_history_store()
+    start, end = _day(start), _day(end)
+    backfill(store, base, quote, start, end)
+    return store.read(base, quote, start, end)
+
+
+def load_series(base, quote, start, end, store=None):
+    """RateSeries for start..end, fetching only what the store lacks"""
+    store = store or get_history_store()
+    start, end = _day(start), _day(end)
+    backfill(store, base, quote, start, end)
+    return store.read_series(base, quote, start, end)
+
+
+def load_history_multi(base, quotes, start, end, store=None):
+    """{quote: (date, rate) rows} for several quotes against one base.
+
+    Every quote with a gap is fetched in a single comma-separated range
+    request spanning all gaps; rows already stored are simply rewritten.
+    """
+    store = store or get_history_store()
+    start, end = _day(start), _day(end)
+
+    gaps = {quote: store.missing_ranges(base, quote, start, end) for quote in quotes}
+    group = [quote for quote in quotes if gaps[quote]]
+    if group:
+        fetch_start = min(s for quote in group for s, _ in gaps[quote])
+        fetch_end = max(e for quote in group for _, e in gaps[quote])
+        try:
+            data = fetch_range(base, ','.join(group), fetch_start, fetch_end)
+        except requests.exceptions.RequestException:
+            if any(store.coverage(base, quote) is None for quote in group):
+                raise
+        else:
+            for quote in group:
+                record_range(store, base, quote, fetch_start, fetch_end, range_rows(data, quote))
+
+    return {quote: store.read(base, quote, start, end) for quote in quotes}
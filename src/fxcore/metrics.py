@@ -0,0 +1,218 @@
+"""Process-wide counters and timings in Prometheus text format.
+
+Metrics are plain in-memory objects registered on REGISTRY. Set
+FX_METRICS_PORT to expose them on http://127.0.0.1:<port>/metrics; the
+Streamlit sidebar can also show a summary when FX_OPERATOR_PANEL=1.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0)
+
+
+def _label_key(label_names, labels):
+    return tuple(str(labels.get(name, '')) for name in label_names)
+
+
+def _format_labels(label_names, key, extra=()):
+    pairs = [(n, v) for n, v in zip(label_names, key)] + list(extra)
+    if not pairs:
+        return ''
+    escaped = (v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{n}="{v}"' for (n, _), v in zip(pairs, escaped)) + '}'
+
+
+class Counter:
+    """Monotonic count, optionally split by labels"""
+
+    type = 'counter'
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.label_names, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(_label_key(self.label_names, labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, _format_labels(self.label_names, k), v) for k, v in self._values.items()]
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count of observed values"""
+
+    type = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(self.label_names, labels)
+        with self._lock:
+            state = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall time of a with-block, even if it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def summary(self):
+        """{label tuple: (count, mean)} for quick displays"""
+        with self._lock:
+            return {k: (s[-1], s[-2] / s[-1] if s[-1] else 0.0) for k, s in self._values.items()}
+
+    def samples(self):
+        out = []
+        with self._lock:
+            for key, state in self._values.items():
+                for bound, count in zip(self.buckets, state):
+                    out.append((f'{self.name}_bucket', _format_labels(self.label_names, key, [('le', repr(bound))]), count))
+                out.append((f'{self.name}_bucket', _format_labels(self.label_names, key, [('le', '+Inf')]), state[-1]))
+                out.append((f'{self.name}_sum', _format_labels(self.label_names, key), state[-2]))
+                out.append((f'{self.name}_count', _format_labels(self.label_names, key), state[-1]))
+        return out
+
+
+class Registry:
+    """Holds metrics plus collectors that read other components' stats at scrape time"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help, labels=()):
+        return self.register(Counter(name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def add_collector(self, collect):
+        """collect() returns [(name, type, help, [(labels dict, value)])]"""
+        with self._lock:
+            self._collectors.append(collect)
+
+    def render(self):
+        """All metrics in Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            lines.extend(f'{name}{labels} {value}' for name, labels, value in metric.samples())
+        for collect in collectors:
+            for name, kind, help, samples in collect():
+                lines.append(f'# HELP {name} {help}')
+                lines.append(f'# TYPE {name} {kind}')
+                for labels, value in samples:
+                    lines.append(f'{name}{_format_labels(tuple(labels), tuple(labels.values()))} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    'fx_upstream_request_seconds', "Duration of upstream HTTP requests", ('endpoint', 'status'))
+UPSTREAM_BYTES = REGISTRY.counter(
+    'fx_upstream_response_bytes_total', "Bytes received from the upstream", ('endpoint',))
+UPSTREAM_RETRIES = REGISTRY.counter(
+    'fx_upstream_retries_total', "Upstream requests retried after a transient failure", ('endpoint',))
+JSON_DECODE_SECONDS = REGISTRY.histogram(
+    'fx_json_decode_seconds', "Time spent decoding upstream JSON bodies", ('endpoint',))
+RERUN_SECONDS = REGISTRY.histogram(
+    'fx_rerun_seconds', "Wall time of one Streamlit rerun of main()")
+FRAGMENT_SECONDS = REGISTRY.histogram(
+    'fx_fragment_seconds', "Wall time of one render of a page fragment", ('fragment',))
+BUDGET_EXHAUSTED = REGISTRY.counter(
+    'fx_upstream_budget_exhausted_total', "Upstream calls skipped or cut short by the rerun time budget")
+RATE_LIMIT_WAIT_SECONDS = REGISTRY.histogram(
+    'fx_ratelimit_wait_seconds', "Time upstream requests waited for a rate limit token", ('priority',))
+
+
+def endpoint_label(url):
+    """Low-cardinality endpoint name for a Frankfurter URL"""
+    path = url.split('://', 1)[-1].split('/', 1)[-1].split('?', 1)[0]
+    if path == 'currencies':
+        return 'currencies'
+    if path == 'latest':
+        return 'latest'
+    return 'history' if '..' in path else 'date'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_failed = False
+_server_lock = threading.Lock()
+
+
+def start_http_server(port, host='127.0.0.1'):
+    """Serve /metrics on a daemon thread; later calls return the running server"""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name='metrics-http', daemon=True).start()
+        return _server
+
+
+def start_from_env():
+    """Start the /metrics endpoint if FX_METRICS_PORT is set"""
+    global _server_failed
+    port = os.environ.get('FX_METRICS_PORT')
+    if not port or _server_failed:
+        return None
+    try:
+        return start_http_server(int(port))
+    except OSError:
+        # Another process on this host already serves the port
+        _server_failed = True
+        return None
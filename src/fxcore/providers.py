@@ -0,0 +1,330 @@
+"""Pluggable exchange rate providers.
+
+Every fetch goes through the process-wide provider returned by
+get_provider(). Providers answer with Frankfurter-shaped dicts, so the rest
+of the code does not care where the rates come from. FX_PROVIDER selects
+the implementation:
+
+    FX_PROVIDER=frankfurter  live API at FX_API_BASE_URL (default)
+    FX_PROVIDER=fake         deterministic in-process fixtures, with an
+                             optional FX_FAKE_LATENCY in seconds
+
+The fake can also be served over HTTP as a local Frankfurter stand-in,
+for load tests that should exercise the real network stack:
+
+    cd src && python -m fxcore.providers --port 8080 --latency 0.05
+    FX_API_BASE_URL=http://127.0.0.1:8080 streamlit run src/app.py
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from .frankfurter import API_BASE_URL, CLIENT
+
+
+class RateProvider:
+    """Interface the fetch functions use to reach an exchange rate source"""
+
+    name = 'provider'
+
+    def currencies(self):
+        """{code: name} for every quoted currency"""
+        raise NotImplementedError
+
+    def latest(self, base):
+        """{'base', 'date', 'rates'} for the most recent fixing"""
+        raise NotImplementedError
+
+    def on_date(self, day, base):
+        """{'base', 'date', 'rates'} for the last fixing on or before day"""
+        raise NotImplementedError
+
+    def history(self, base, quote, start, end):
+        """{'base', 'start_date', 'end_date', 'rates': {date: {quote: rate}}}"""
+        raise NotImplementedError
+
+    def async_session(self):
+        """Async context manager exposing currencies/latest/history coroutines"""
+        return ThreadedAsyncSession(self)
+
+
+class ThreadedAsyncSession:
+    """Runs a synchronous provider's calls on worker threads"""
+
+    def __init__(self, provider):
+        self.provider = provider
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def currencies(self):
+        return await asyncio.to_thread(self.provider.currencies)
+
+    async def latest(self, base):
+        return await asyncio.to_thread(self.provider.latest, base)
+
+    async def history(self, base, quote, start, end):
+        return await asyncio.to_thread(self.provider.history, base, quote, start, end)
+
+
+class FrankfurterProvider(RateProvider):
+    """The public Frankfurter API, or any server speaking its protocol"""
+
+    name = 'frankfurter'
+
+    def __init__(self, base_url=API_BASE_URL, client=CLIENT):
+        self.base_url = base_url.rstrip('/')
+        self.client = client
+
+    def currencies(self):
+        return self.client.get_json(f"{self.base_url}/currencies", timeout=10)
+
+    def latest(self, base):
+        return self.client.get_json(f"{self.base_url}/latest?from={base}", timeout=10)
+
+    def on_date(self, day, base):
+        return self.client.get_json(f"{self.base_url}/{day}?from={base}", timeout=10)
+
+    def history(self, base, quote, start, end):
+        return self.client.get_json(
+            f"{self.base_url}/{start}..{end}?from={base}&to={quote}", timeout=15
+        )
+
+    def async_session(self):
+        from .async_client import AsyncFrankfurterClient
+        return AsyncFrankfurterClient(self.base_url)
+
+
+# Euro reference rates the fake provider varies around
+FIXTURE_RATES = {
+    'AUD': 1.6523, 'BGN': 1.9558, 'BRL': 6.0712, 'CAD': 1.4935, 'CHF': 0.9402,
+    'CNY': 7.7618, 'CZK': 25.172, 'DKK': 7.4589, 'GBP': 0.8571, 'HKD': 8.4512,
+    'HUF': 392.45, 'IDR': 17765.0, 'ILS': 4.0881, 'INR': 95.124, 'ISK': 143.9,
+    'JPY': 162.37, 'KRW': 1529.8, 'MXN': 21.512, 'MYR': 4.8891, 'NOK': 11.702,
+    'NZD': 1.8834, 'PHP': 63.521, 'PLN': 4.2615, 'RON': 4.9771, 'SEK': 11.018,
+    'SGD': 1.4982, 'THB': 37.846, 'TRY': 46.208, 'USD': 1.0867, 'ZAR': 20.384,
+}
+
+FIXTURE_NAMES = {
+    'AUD': 'Australian Dollar', 'BGN': 'Bulgarian Lev', 'BRL': 'Brazilian Real',
+    'CAD': 'Canadian Dollar', 'CHF': 'Swiss Franc', 'CNY': 'Chinese Renminbi Yuan',
+    'CZK': 'Czech Koruna', 'DKK': 'Danish Krone', 'EUR': 'Euro', 'GBP': 'British Pound',
+    'HKD': 'Hong Kong Dollar', 'HUF': 'Hungarian Forint', 'IDR': 'Indonesian Rupiah',
+    'ILS': 'Israeli New Sheqel', 'INR': 'Indian Rupee', 'ISK': 'Icelandic Króna',
+    'JPY': 'Japanese Yen', 'KRW': 'South Korean Won', 'MXN': 'Mexican Peso',
+    'MYR': 'Malaysian Ringgit', 'NOK': 'Norwegian Krone', 'NZD': 'New Zealand Dollar',
+    'PHP': 'Philippine Peso', 'PLN': 'Polish Złoty', 'RON': 'Romanian Leu',
+    'SEK': 'Swedish Krona', 'SGD': 'Singapore Dollar', 'THB': 'Thai Baht',
+    'TRY': 'Turkish Lira', 'USD': 'United States Dollar', 'ZAR': 'South African Rand',
+}
+
+
+def _last_fixing(day):
+    """Most recent weekday on or before day"""
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+class FakeProvider(RateProvider):
+    """Deterministic offline stand-in for Frankfurter.
+
+    Rates follow a smooth, reproducible curve around FIXTURE_RATES, with
+    fixings on weekdays only. Every call sleeps for latency seconds so
+    benchmarks can model a remote provider.
+    """
+
+    name = 'fake'
+
+    def __init__(self, latency=0.0, rates=None, today=None):
+        self.latency = latency
+        self.rates = dict(FIXTURE_RATES if rates is None else rates)
+        self.rates['EUR'] = 1.0
+        self.today = today
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _call(self):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _not_found(self):
+        response = requests.Response()
+        response.status_code = 404
+        raise requests.exceptions.HTTPError("404 Client Error: Not Found", response=response)
+
+    def _eur_rate(self, code, day):
+        # Stable per-currency phase so every currency moves differently
+        phase = sum(ord(c) for c in code)
+        return self.rates[code] * (1 + 0.02 * math.sin(day.toordinal() / 17 + phase))
+
+    def _table(self, base, day, quotes=None):
+        if base not in self.rates:
+            self._not_found()
+        base_rate = 1.0 if base == 'EUR' else self._eur_rate(base, day)
+        codes = quotes if quotes is not None else self.rates
+        return {
+            code: round((1.0 if code == 'EUR' else self._eur_rate(code, day)) / base_rate, 6)
+            for code in codes
+            if code in self.rates and code != base
+        }
+
+    def _latest_day(self):
+        return _last_fixing(self.today or date.today())
+
+    def currencies(self):
+        self._call()
+        return {code: FIXTURE_NAMES.get(code, code) for code in sorted(self.rates)}
+
+    def latest(self, base):
+        self._call()
+        day = self._latest_day()
+        return {'amount': 1.0, 'base': base, 'date': day.isoformat(), 'rates': self._table(base, day)}
+
+    def on_date(self, day, base):
+        self._call()
+        day = _last_fixing(min(date.fromisoformat(str(day)), self._latest_day()))
+        return {'amount': 1.0, 'base': base, 'date': day.isoformat(), 'rates': self._table(base, day)}
+
+    def history(self, base, quote, start, end):
+        self._call()
+        start = date.fromisoformat(str(start))
+        end = min(date.fromisoformat(str(end)), self._latest_day())
+        quotes = quote.split(',') if quote else None
+        rates = {}
+        day = start
+        while day <= end:
+            if day.weekday() < 5:
+                rates[day.isoformat()] = self._table(base, day, quotes)
+            day += timedelta(days=1)
+        return {
+            'amount': 1.0, 'base': base,
+            'start_date': start.isoformat(), 'end_date': end.isoformat(),
+            'rates': rates,
+        }
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def make_provider(name=None):
+    """Build the provider named by FX_PROVIDER (or name)"""
+    name = name or os.environ.get('FX_PROVIDER', 'frankfurter')
+    if name == 'fake':
+        return FakeProvider(latency=float(os.environ.get('FX_FAKE_LATENCY', '0')))
+    if name == 'frankfurter':
+        return FrankfurterProvider()
+    raise ValueError(f"Unknown FX_PROVIDER {name!r}")
+
+
+def get_provider():
+    """Process-wide provider, created on first use"""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = make_provider()
+        return _provider
+
+
+def set_provider(provider):
+    """Swap the process-wide provider, returning the previous one"""
+    global _provider
+    with _provider_lock:
+        previous, _provider = _provider, provider
+    return previous
+
+
+_DAY = r'\d{4}-\d{2}-\d{2}'
+_RANGE_PATH = re.compile(rf'^/({_DAY})\.\.({_DAY})?$')
+_DAY_PATH = re.compile(rf'^/({_DAY})$')
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    provider = None
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        # Answer conditional requests like Frankfurter, with a 304 for an unchanged body
+        etag = '"%s"' % hashlib.sha1(payload).hexdigest()
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        if status == 200:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        base = query.get('from', 'EUR')
+        try:
+            if url.path == '/currencies':
+                body = self.provider.currencies()
+            elif url.path == '/latest':
+                body = self.provider.latest(base)
+            elif _RANGE_PATH.match(url.path):
+                start, end = _RANGE_PATH.match(url.path).groups()
+                body = self.provider.history(base, query.get('to'), start, end or date.today().isoformat())
+            elif _DAY_PATH.match(url.path):
+                body = self.provider.on_date(_DAY_PATH.match(url.path).group(1), base)
+            else:
+                return self._send(404, {'message': 'not found'})
+        except requests.exceptions.HTTPError:
+            return self._send(404, {'message': 'not found'})
+        self._send(200, body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(provider, host='127.0.0.1', port=8080):
+    """Serve a provider over HTTP using Frankfurter's URL scheme"""
+    handler = type('StandInHandler', (_StandInHandler,), {'provider': provider})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve deterministic Frankfurter-compatible rates")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args(argv)
+
+    server = serve(FakeProvider(latency=args.latency), args.host, args.port)
+    print(f"Serving fake Frankfurter API on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,294 @@
+"""Process-wide cache for Frankfurter API responses.
+
+Streamlit re-executes app.py on every rerun, so anything defined at module
+level there is rebuilt each time. This module is imported normally and stays
+in sys.modules, which makes RATE_CACHE shared by every session in the process.
+Behind it, a SharedCache file lets the other processes on the host reuse
+what this one fetched.
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from .budget import BudgetExceededError
+from .metrics import REGISTRY
+from .schedule import latest_ttl
+from .shared_cache import shared_cache_from_env
+from .singleflight import SingleFlight
+
+# Time-to-live per endpoint, in seconds or as a function of the cached value
+DEFAULT_TTLS = {
+    'currencies': 24 * 60 * 60,
+    # Current until the next ECB fixing is due
+    'latest': latest_ttl,
+    'history': 60 * 60,
+    # Fixings for past dates never change
+    'historical': 7 * 24 * 60 * 60,
+}
+
+DEFAULT_TTL = 5 * 60
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# Failed loads are remembered for NEGATIVE_TTL seconds, doubling with each
+# consecutive failure of the same key up to MAX_NEGATIVE_TTL
+NEGATIVE_TTL = 5
+MAX_NEGATIVE_TTL = 5 * 60
+MAX_FAILURES = 1024
+# Loader errors worth remembering: network failures and upstream error answers
+NEGATIVE_ERRORS = (OSError,)
+
+
+def estimate_size(value):
+    """Rough deep size of a decoded JSON value or plain object in bytes"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        for k, v in value.items():
+            size += estimate_size(k) + estimate_size(v)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            size += estimate_size(item)
+    elif hasattr(value, '__dict__'):
+        size += estimate_size(vars(value))
+    return size
+
+
+def remembered_error(error):
+    """Whether a loader error should be remembered as a negative entry"""
+    if isinstance(error, BudgetExceededError) and error.skipped:
+        return False
+    return isinstance(error, NEGATIVE_ERRORS)
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-endpoint expiry and a memory bound.
+
+    Entries are keyed by (endpoint, pair, date_range). Least recently used
+    entries are evicted once the estimated size exceeds max_bytes; expired
+    entries stay until then so they can be served while the upstream fails.
+    Keys whose loader failed are remembered with exponentially growing
+    expiry, so repeated lookups fail fast instead of waiting on the upstream.
+    With a shared backend, misses are looked up there before calling the
+    loader and loaded values are published to it.
+    """
+
+    def __init__(self, ttls=None, max_bytes=DEFAULT_MAX_BYTES, default_ttl=DEFAULT_TTL, backend=None):
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.backend = backend
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._by_endpoint = {}  # endpoint -> [hits, misses]
+        self._failures = OrderedDict()  # key -> (error, expires_at, consecutive failures)
+        self.negative_hits = 0
+        self._flight = SingleFlight()
+
+    def _ttl(self, endpoint, value):
+        ttl = self.ttls.get(endpoint, self.default_ttl)
+        return ttl(value) if callable(ttl) else ttl
+
+    def _drop(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, endpoint, pair=None, date_range=None):
+        """Return (found, value) for a key, counting the hit or miss"""
+        key = (endpoint, pair, date_range)
+        with self._lock:
+            entry = self._entries.get(key)
+            counts = self._by_endpoint.setdefault(endpoint, [0, 0])
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                counts[0] += 1
+                return True, entry[0]
+            self.misses += 1
+            counts[1] += 1
+            return False, None
+
+    def get_stale(self, endpoint, pair=None, date_range=None):
+        """Return (found, value) including expired entries that were not evicted yet"""
+        with self._lock:
+            entry = self._entries.get((endpoint, pair, date_range))
+            return (True, entry[0]) if entry is not None else (False, None)
+
+    def contains(self, endpoint, pair=None, date_range=None):
+        """Whether a fresh entry exists, without touching counters or LRU order"""
+        with self._lock:
+            entry = self._entries.get((endpoint, pair, date_range))
+            return entry is not None and entry[1] > time.monotonic()
+
+    def expires_in(self, endpoint, pair=None, date_range=None):
+        """Seconds until an entry expires (negative once stale), or None if absent"""
+        with self._lock:
+            entry = self._entries.get((endpoint, pair, date_range))
+            return None if entry is None else entry[1] - time.monotonic()
+
+    def set(self, endpoint, value, pair=None, date_range=None, size=None, ttl=None, publish=True):
+        """Store a value under its endpoint TTL (or ttl), evicting old entries if needed.
+
+        A ttl of zero or less stores the value already stale, to be served
+        while it is revalidated. Fresh values are published to the shared
+        backend unless publish is false.
+        """
+        if ttl is None:
+            ttl = self._ttl(endpoint, value)
+        if publish and self.backend is not None:
+            self.backend.publish(endpoint, value, ttl, pair, date_range)
+        key = (endpoint, pair, date_range)
+        if size is None:
+            size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, time.monotonic() + ttl, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def failure(self, endpoint, pair=None, date_range=None):
+        """The error of a key's last failed load while it is remembered, else None"""
+        with self._lock:
+            entry = self._failures.get((endpoint, pair, date_range))
+            return entry[0] if entry is not None and entry[1] > time.monotonic() else None
+
+    def remember_failure(self, endpoint, error, pair=None, date_range=None):
+        """Remember a failed load of a key, doubling the expiry on each consecutive failure"""
+        key = (endpoint, pair, date_range)
+        with self._lock:
+            previous = self._failures.pop(key, None)
+            count = previous[2] + 1 if previous else 1
+            ttl = min(MAX_NEGATIVE_TTL, NEGATIVE_TTL * 2 ** (count - 1))
+            self._failures[key] = (error, time.monotonic() + ttl, count)
+            while len(self._failures) > MAX_FAILURES:
+                self._failures.popitem(last=False)
+
+    def get_or_load(self, endpoint, loader, pair=None, date_range=None):
+        """Return the cached value or call loader() and cache its result.
+
+        Concurrent misses for the same key share a single loader call.
+        If loader fails and an expired entry is still held, that stale value
+        is returned instead. Network errors are remembered for the key, and
+        until they expire the stale value or the same error is returned
+        without calling loader. Calls skipped because the rerun budget was
+        spent are not remembered.
+        """
+        found, value = self.get(endpoint, pair, date_range)
+        if found:
+            return value
+
+        key = (endpoint, pair, date_range)
+        error = self.failure(*key)
+        if error is not None:
+            with self._lock:
+                self.negative_hits += 1
+            found, value = self.get_stale(*key)
+            if found:
+                return value
+            raise error.with_traceback(None)
+
+        def load():
+            # Another caller may have stored the value while we waited
+            if self.contains(endpoint, pair, date_range):
+                return self.get_stale(endpoint, pair, date_range)[1]
+            return self._load(endpoint, loader, pair, date_range)
+
+        try:
+            value = self._flight.do(key, load)
+        except Exception as e:
+            if remembered_error(e):
+                self.remember_failure(endpoint, e, pair, date_range)
+            found, value = self.get_stale(*key)
+            if found:
+                return value
+            raise
+        with self._lock:
+            self._failures.pop(key, None)
+        return value
+
+    def _load(self, endpoint, loader, pair, date_range, outlives=0.0):
+        # A value another process published is as good as our own fetch
+        if self.backend is not None:
+            shared = self.backend.get(endpoint, pair, date_range)
+            if shared is not None and shared[1] > outlives:
+                value, ttl = shared
+                self.set(endpoint, value, pair, date_range, ttl=ttl, publish=False)
+                return value
+        value = loader()
+        self.set(endpoint, value, pair, date_range)
+        return value
+
+    def reload(self, endpoint, loader, pair=None, date_range=None):
+        """Replace an entry whether or not it is fresh, preferring a newer shared value"""
+        # Only a shared value that outlives ours counts as newer
+        outlives = max(0.0, self.expires_in(endpoint, pair, date_range) or 0.0) + 1
+        return self._flight.do((endpoint, pair, date_range),
+                               lambda: self._load(endpoint, loader, pair, date_range, outlives))
+
+    def invalidate(self, endpoint=None):
+        """Drop every entry and remembered failure, or only those of one endpoint.
+
+        Entries in the shared backend are dropped for every process.
+        """
+        if self.backend is not None:
+            self.backend.invalidate(endpoint)
+        with self._lock:
+            for key in [k for k in self._entries if endpoint is None or k[0] == endpoint]:
+                self._drop(key)
+            for key in [k for k in self._failures if endpoint is None or k[0] == endpoint]:
+                del self._failures[key]
+
+    def stats(self):
+        """Hit/miss counters and current memory usage"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'coalesced': self._flight.shared,
+                'negative_hits': self.negative_hits,
+                'negative_entries': len(self._failures),
+                'shared_hits': self.backend.hits if self.backend else 0,
+                'shared_publishes': self.backend.publishes if self.backend else 0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'endpoints': {e: {'hits': h, 'misses': m} for e, (h, m) in self._by_endpoint.items()},
+            }
+
+
+# Shared by all sessions served by this process, and through the backend by the host
+RATE_CACHE = TTLCache(backend=shared_cache_from_env())
+
+
+def _collect():
+    stats = RATE_CACHE.stats()
+    lookups = []
+    for endpoint, counts in stats['endpoints'].items():
+        lookups.append(({'endpoint': endpoint, 'result': 'hit'}, counts['hits']))
+        lookups.append(({'endpoint': endpoint, 'result': 'miss'}, counts['misses']))
+    return [
+        ('fx_cache_lookups_total', 'counter', "Rate cache lookups by endpoint and result", lookups),
+        ('fx_cache_hit_ratio', 'gauge', "Share of rate cache lookups that hit", [({}, stats['hit_ratio'])]),
+        ('fx_cache_entries', 'gauge', "Entries held in the rate cache", [({}, stats['entries'])]),
+        ('fx_cache_bytes', 'gauge', "Estimated size of the rate cache", [({}, stats['bytes'])]),
+        ('fx_cache_evictions_total', 'counter', "Entries evicted from the rate cache", [({}, stats['evictions'])]),
+        ('fx_cache_coalesced_total', 'counter', "Cache loads shared with a concurrent caller", [({}, stats['coalesced'])]),
+        ('fx_cache_negative_hits_total', 'counter', "Lookups answered from a remembered failure",
+         [({}, stats['negative_hits'])]),
+        ('fx_cache_shared_hits_total', 'counter', "Misses answered from the host's shared cache",
+         [({}, stats['shared_hits'])]),
+    ]
+
+
+REGISTRY.add_collector(_collect)
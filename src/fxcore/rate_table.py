@@ -0,0 +1,78 @@
+"""Cross-rate engine built on a single base-rate snapshot.
+
+Frankfurter returns every rate against one base in a single /latest
+response. Any pair is then derived by triangulating through that base, so
+upstream traffic does not grow with the number of pairs users look at.
+"""
+import time
+
+from .providers import get_provider
+from .rate_cache import RATE_CACHE
+from .refresher import REFRESHER
+
+# ECB reference rates are published against the euro
+DEFAULT_BASE = 'EUR'
+
+
+class RateTable:
+    """Rates of every quoted currency against one base currency"""
+
+    def __init__(self, base, date, rates, fetched_at=None):
+        self.base = base
+        self.date = date
+        # Wall-clock time the snapshot was received from the provider
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+        self.rates = dict(rates)
+        self.rates[base] = 1.0
+        # Structures computed from this snapshot, such as cross-rate matrices
+        self.derived = {}
+
+    @classmethod
+    def from_response(cls, data):
+        """Build a table from a decoded /latest or /<date> response"""
+        return cls(data['base'], data.get('date'), data['rates'])
+
+    def __contains__(self, code):
+        return code in self.rates
+
+    def age(self):
+        """Seconds since the snapshot was fetched"""
+        return time.time() - self.fetched_at
+
+    def currencies(self):
+        """Codes quoted in this snapshot, base included"""
+        return sorted(self.rates)
+
+    def cross(self, from_curr, to_curr):
+        """Units of to_curr per one from_curr, or None if either is not quoted"""
+        if from_curr == to_curr:
+            return 1.0
+        from_rate = self.rates.get(from_curr)
+        to_rate = self.rates.get(to_curr)
+        if not from_rate or not to_rate:
+            return None
+        return to_rate / from_rate
+
+
+def load_rate_table(base=DEFAULT_BASE):
+    """Fetch the latest snapshot from the provider, bypassing caches"""
+    return RateTable.from_response(get_provider().latest(base))
+
+
+def fetch_rate_table(base=DEFAULT_BASE):
+    """Latest snapshot of all rates against base.
+
+    Served from memory once loaded; a stale snapshot is returned right away
+    while the background refresher fetches a new one.
+    """
+    return REFRESHER.serve('latest', lambda: load_rate_table(base), pair=base)
+
+
+def fetch_rate_table_on(day, base=DEFAULT_BASE):
+    """Snapshot published for a past date (the last fixing on or before it)"""
+    day = str(day)
+
+    def load():
+        return RateTable.from_response(get_provider().on_date(day, base))
+
+    return RATE_CACHE.get_or_load('historical', load, pair=base, date_range=day)
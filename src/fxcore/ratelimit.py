@@ -0,0 +1,140 @@
+"""Token-bucket limiter in front of every upstream request.
+
+All sessions and threads in the process draw from one bucket refilled at
+FX_RATE_LIMIT requests per second, holding up to FX_RATE_BURST tokens.
+When the bucket is empty, callers queue by priority: interactive lookups
+(latest rates, currencies, dated snapshots) go before history backfill,
+which goes before background refreshes. Waiting counts against the rerun
+budget, and queue depth and wait time are exported as metrics.
+"""
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from . import budget
+from .budget import BudgetExceededError
+from .metrics import BUDGET_EXHAUSTED, RATE_LIMIT_WAIT_SECONDS, REGISTRY
+
+INTERACTIVE = 0
+BACKFILL = 1
+BACKGROUND = 2
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BACKFILL: 'backfill', BACKGROUND: 'background'}
+
+# Frankfurter publishes no quota; stay well below what a shared IP gets throttled at
+DEFAULT_RATE = float(os.environ.get('FX_RATE_LIMIT', 10))
+DEFAULT_BURST = float(os.environ.get('FX_RATE_BURST', 20))
+
+_priority = contextvars.ContextVar('fx_request_priority', default=None)
+
+
+@contextmanager
+def request_priority(priority):
+    """Run upstream requests made inside the block at priority"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority(endpoint):
+    """Priority for a request to endpoint: the enclosing request_priority() or its default"""
+    priority = _priority.get()
+    if priority is not None:
+        return priority
+    return BACKFILL if endpoint == 'history' else INTERACTIVE
+
+
+class PriorityLimiter:
+    """Token bucket whose waiters are served by priority, then in arrival order"""
+
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._waiters = []  # heap of (priority, arrival)
+        self._arrivals = itertools.count()
+        self._cond = threading.Condition()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, priority=INTERACTIVE):
+        """Take a token without waiting, if one is free and nobody is queued"""
+        if self.rate <= 0:
+            return True
+        with self._cond:
+            self._refill()
+            if self._waiters or self._tokens < 1:
+                return False
+            self._tokens -= 1
+        RATE_LIMIT_WAIT_SECONDS.observe(0.0, priority=PRIORITY_NAMES[priority])
+        return True
+
+    def acquire(self, priority=INTERACTIVE, timeout=None):
+        """Take a token, queueing behind higher-priority callers.
+
+        Returns False if timeout seconds pass first.
+        """
+        if self.rate <= 0:
+            return True
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        me = (priority, next(self._arrivals))
+        with self._cond:
+            heapq.heappush(self._waiters, me)
+            try:
+                while True:
+                    self._refill()
+                    first = self._waiters[0] == me
+                    if first and self._tokens >= 1:
+                        self._tokens -= 1
+                        break
+                    # Only the head of the queue knows when its token arrives
+                    wait = (1 - self._tokens) / self.rate if first else None
+                    if deadline is not None:
+                        left = deadline - time.monotonic()
+                        if left <= 0:
+                            return False
+                        wait = left if wait is None else min(wait, left)
+                    self._cond.wait(wait)
+            finally:
+                self._waiters.remove(me)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+        RATE_LIMIT_WAIT_SECONDS.observe(time.monotonic() - start, priority=PRIORITY_NAMES[priority])
+        return True
+
+    def queued(self):
+        """Number of callers waiting, per priority name"""
+        with self._cond:
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _ in self._waiters:
+                depth[PRIORITY_NAMES[priority]] += 1
+            return depth
+
+
+# Shared by every session and thread in this process
+LIMITER = PriorityLimiter()
+
+
+def wait_for_token(endpoint, what="upstream call"):
+    """Wait for LIMITER to admit a request to endpoint, within the rerun budget"""
+    left = budget.remaining()
+    if (left is None or left > 0) and LIMITER.acquire(current_priority(endpoint), left):
+        return
+    BUDGET_EXHAUSTED.inc()
+    raise BudgetExceededError(f"Rerun time budget spent waiting to start {what}", skipped=True)
+
+
+REGISTRY.add_collector(lambda: [(
+    'fx_ratelimit_queue_depth', 'gauge', "Upstream requests waiting for a rate limit token",
+    [({'priority': name}, depth) for name, depth in LIMITER.queued().items()]
+)])
@@ -0,0 +1,142 @@
+"""Background refresh with stale-while-revalidate serving.
+
+serve() answers from RATE_CACHE whenever any value is held, fresh or not.
+Stale values are returned immediately and revalidated on a worker thread,
+which also keeps every recently served entry warm on a schedule. Only the
+very first request for a key waits for the upstream.
+"""
+import threading
+import time
+
+from .metrics import REGISTRY
+from .rate_cache import RATE_CACHE
+from .ratelimit import BACKGROUND, request_priority
+
+# Seconds between scheduled refresh passes
+REFRESH_INTERVAL = 60
+# Entries expiring within this many seconds are refreshed ahead of time
+REFRESH_AHEAD = 2 * REFRESH_INTERVAL
+# Most popular keys kept warm by the scheduled pass
+MAX_TRACKED = 20
+
+
+class BackgroundRefresher:
+    """One worker thread per process that revalidates RATE_CACHE entries"""
+
+    def __init__(self, cache=RATE_CACHE, interval=REFRESH_INTERVAL, max_tracked=MAX_TRACKED):
+        self.cache = cache
+        self.interval = interval
+        self.max_tracked = max_tracked
+        self._tracked = {}  # key -> [score, loader]
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self.refreshes = 0
+        self.failures = 0
+
+    def start(self):
+        """Start the worker thread if it is not running yet"""
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='rate-refresher', daemon=True)
+                self._thread.start()
+
+    def serve(self, endpoint, loader, pair=None, date_range=None):
+        """Cached value for a key, revalidating in the background when stale"""
+        key = (endpoint, pair, date_range)
+        self._track(key, loader)
+        if self.cache.contains(*key):
+            return self.cache.get(*key)[1]
+        found, value = self.cache.get_stale(*key)
+        if found:
+            self.revalidate(key)
+            return value
+        return self.cache.get_or_load(endpoint, loader, pair, date_range)
+
+    def revalidate(self, key):
+        """Queue a background refresh of one tracked key"""
+        with self._lock:
+            self._pending.add(key)
+        self.start()
+        self._wake.set()
+
+    def _track(self, key, loader):
+        with self._lock:
+            entry = self._tracked.setdefault(key, [0.0, loader])
+            entry[0] += 1
+            entry[1] = loader
+            if len(self._tracked) > self.max_tracked:
+                coldest = min(self._tracked, key=lambda k: self._tracked[k][0])
+                del self._tracked[coldest]
+                self._pending.discard(coldest)
+        self.start()
+
+    def _refresh(self, key):
+        with self._lock:
+            entry = self._tracked.get(key)
+        if entry is None:
+            return
+        try:
+            # Another process may already have refreshed this key
+            with request_priority(BACKGROUND):
+                self.cache.reload(key[0], entry[1], key[1], key[2])
+            self.refreshes += 1
+        except Exception:
+            # The stale value keeps being served; the next pass retries
+            self.failures += 1
+
+    def _due(self):
+        """Tracked keys that are stale or about to expire, hottest first"""
+        with self._lock:
+            keys = sorted(self._tracked, key=lambda k: -self._tracked[k][0])
+            # Decay scores so keys nobody asks for any more drop out
+            for entry in self._tracked.values():
+                entry[0] /= 2
+        due = []
+        for key in keys:
+            remaining = self.cache.expires_in(*key)
+            if remaining is None or remaining < REFRESH_AHEAD:
+                due.append(key)
+        return due
+
+    def _run(self):
+        next_pass = time.monotonic() + self.interval
+        while True:
+            self._wake.wait(timeout=max(0.0, next_pass - time.monotonic()))
+            self._wake.clear()
+            with self._lock:
+                pending, self._pending = self._pending, set()
+            for key in pending:
+                self._refresh(key)
+            if time.monotonic() >= next_pass:
+                for key in self._due():
+                    if key not in pending:
+                        self._refresh(key)
+                next_pass = time.monotonic() + self.interval
+
+    def stats(self):
+        with self._lock:
+            return {
+                'tracked': len(self._tracked),
+                'pending': len(self._pending),
+                'refreshes': self.refreshes,
+                'failures': self.failures,
+                'running': self._thread is not None and self._thread.is_alive(),
+            }
+
+
+# Shared by all sessions served by this process
+REFRESHER = BackgroundRefresher()
+
+
+def _collect():
+    stats = REFRESHER.stats()
+    return [
+        ('fx_refresher_refreshes_total', 'counter', "Background cache refreshes", [({}, stats['refreshes'])]),
+        ('fx_refresher_failures_total', 'counter', "Background cache refreshes that failed", [({}, stats['failures'])]),
+        ('fx_refresher_pending', 'gauge', "Keys queued for revalidation", [({}, stats['pending'])]),
+    ]
+
+
+REGISTRY.add_collector(_collect)
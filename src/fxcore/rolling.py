@@ -0,0 +1,207 @@
+"""Rolling statistics over daily rate series.
+
+Windows are calendar days ending at the latest fixing. Each window reports
+the moving average, annualized volatility of daily log returns, percent
+change from the first fixing in the window, and the high and low.
+
+RollingStats keeps running sums and monotonic deques, so appending a new
+fixing costs O(1) amortized; the process-wide engine behind pair_stats()
+only feeds it the fixings added since the previous rerun. rolling_stats()
+computes the same figures for every date and many pairs at once with
+NumPy.
+"""
+import math
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from .series import day_ordinal
+
+DEFAULT_WINDOW = 30
+# Fixings per year used to annualize daily volatility
+TRADING_DAYS = 252
+# Pairs and windows whose running state is kept between reruns
+MAX_ENGINES = 256
+
+
+class RollingStats:
+    """Running statistics over the last window calendar days of one series"""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self.first_day = None
+        self.last_day = None
+        self.last_rate = None
+        self._entries = deque()  # (day, rate, log return from the previous fixing)
+        self._highs = deque()    # (day, rate), rates decreasing
+        self._lows = deque()     # (day, rate), rates increasing
+        self._sum = 0.0
+        self._ret_sum = 0.0
+        self._ret_sq = 0.0
+        self._ret_count = 0
+
+    def append(self, day, rate):
+        """Add the next fixing; days must be increasing"""
+        day = day_ordinal(day) if isinstance(day, str) else int(day)
+        if self.last_day is not None and day <= self.last_day:
+            raise ValueError(f"Fixings must be appended in date order, got {day} after {self.last_day}")
+        ret = math.log(rate / self.last_rate) if self.last_rate else None
+        if self.first_day is None:
+            self.first_day = day
+        self.last_day, self.last_rate = day, rate
+
+        self._entries.append((day, rate, ret))
+        self._sum += rate
+        if ret is not None:
+            self._ret_sum += ret
+            self._ret_sq += ret * ret
+            self._ret_count += 1
+        while self._highs and self._highs[-1][1] <= rate:
+            self._highs.pop()
+        self._highs.append((day, rate))
+        while self._lows and self._lows[-1][1] >= rate:
+            self._lows.pop()
+        self._lows.append((day, rate))
+
+        oldest = day - self.window + 1
+        while self._entries[0][0] < oldest:
+            _, old_rate, old_ret = self._entries.popleft()
+            self._sum -= old_rate
+            if old_ret is not None:
+                self._ret_sum -= old_ret
+                self._ret_sq -= old_ret * old_ret
+                self._ret_count -= 1
+        while self._highs[0][0] < oldest:
+            self._highs.popleft()
+        while self._lows[0][0] < oldest:
+            self._lows.popleft()
+
+    def extend(self, series):
+        """Append the fixings of a RateSeries newer than the last one seen.
+
+        A series reaching further back than a window that is not yet full
+        restarts the state from that series.
+        """
+        if not len(series):
+            return
+        if self.first_day is not None and series.days[0] < self.first_day \
+                and self.last_day - self.first_day + 1 < self.window:
+            self.__init__(self.window)
+        start = 0 if self.last_day is None else int(np.searchsorted(series.days, self.last_day, side='right'))
+        for day, rate in zip(series.days[start:].tolist(), series.rates[start:].tolist()):
+            self.append(day, rate)
+
+    def snapshot(self):
+        """Statistics for the current window, or None before the first fixing"""
+        if not self._entries:
+            return None
+        # The oldest fixing's return points outside the window
+        ret_sum, ret_sq, count = self._ret_sum, self._ret_sq, self._ret_count
+        first_ret = self._entries[0][2]
+        if first_ret is not None:
+            ret_sum, ret_sq, count = ret_sum - first_ret, ret_sq - first_ret * first_ret, count - 1
+        volatility = None
+        if count >= 2:
+            variance = max(0.0, (ret_sq - ret_sum * ret_sum / count) / (count - 1))
+            volatility = math.sqrt(variance * TRADING_DAYS) * 100
+        return {
+            'window': self.window,
+            'count': len(self._entries),
+            'mean': self._sum / len(self._entries),
+            'volatility': volatility,
+            'change_pct': (self.last_rate / self._entries[0][1] - 1) * 100,
+            'high': self._highs[0][1],
+            'low': self._lows[0][1],
+        }
+
+
+_engines = OrderedDict()
+_engines_lock = threading.Lock()
+
+
+def pair_stats(pair, series, window=DEFAULT_WINDOW):
+    """Rolling statistics for a pair's series, kept up to date incrementally"""
+    key = (pair, window)
+    with _engines_lock:
+        stats = _engines.pop(key, None) or RollingStats(window)
+        _engines[key] = stats
+        while len(_engines) > MAX_ENGINES:
+            _engines.popitem(last=False)
+        stats.extend(series)
+        return stats.snapshot()
+
+
+def _range_reduce(values, starts, ufunc):
+    """ufunc reduced over values[starts[t]:t + 1] for every row t (sparse table)"""
+    levels = [values]
+    while 2 ** len(levels) <= len(values):
+        half = 2 ** (len(levels) - 1)
+        previous = levels[-1]
+        levels.append(ufunc(previous[:-half], previous[half:]))
+    ends = np.arange(len(values))
+    k = np.log2(ends - starts + 1).astype(np.intp)
+    out = np.empty_like(values)
+    for level in np.unique(k):
+        rows = np.flatnonzero(k == level)
+        span = 2 ** level
+        out[rows] = ufunc(levels[level][starts[rows]], levels[level][ends[rows] - span + 1])
+    return out
+
+
+def rolling_stats(days, values, window=DEFAULT_WINDOW):
+    """Rolling statistics for every date, vectorized over pairs.
+
+    days are increasing day ordinals or ISO dates; values is a 1-D array
+    of rates or a 2-D array with one column per pair, NaN where a pair has
+    no fixing. Returns a dict of arrays shaped like values with the keys
+    of RollingStats.snapshot(), except 'window'.
+    """
+    days = np.asarray(days)
+    if days.dtype.kind in 'UO':
+        days = days.astype('datetime64[D]')
+    days = days.astype(np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    column = values.ndim == 1
+    if column:
+        values = values[:, None]
+    starts = np.searchsorted(days, days - window + 1, side='left')
+    ends = np.arange(len(days))
+
+    def window_sum(x):
+        cumulative = np.concatenate([np.zeros((1,) + x.shape[1:]), np.cumsum(x, axis=0)])
+        return cumulative[ends + 1] - cumulative[starts]
+
+    present = ~np.isnan(values)
+    count = window_sum(present.astype(np.float64))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = window_sum(np.where(present, values, 0.0)) / count
+
+        # Returns from the previous row; the first row of each window looks outside it
+        rets = np.full_like(values, np.nan)
+        rets[1:] = np.log(values[1:] / values[:-1])
+        has_ret = ~np.isnan(rets)
+        ret_zero = np.where(has_ret, rets, 0.0)
+        ret_count = window_sum(has_ret.astype(np.float64)) - has_ret[starts]
+        ret_sum = window_sum(ret_zero) - ret_zero[starts]
+        ret_sq = window_sum(ret_zero ** 2) - ret_zero[starts] ** 2
+        variance = np.maximum(0.0, (ret_sq - ret_sum ** 2 / ret_count) / (ret_count - 1))
+        volatility = np.where(ret_count >= 2, np.sqrt(variance * TRADING_DAYS) * 100, np.nan)
+
+        change_pct = (values / values[starts] - 1) * 100
+
+    # fmax/fmin skip the NaN gaps; all-NaN windows stay NaN
+    high = _range_reduce(values, starts, np.fmax)
+    low = _range_reduce(values, starts, np.fmin)
+
+    stats = {
+        'count': count,
+        'mean': mean,
+        'volatility': volatility,
+        'change_pct': change_pct,
+        'high': high,
+        'low': low,
+    }
+    if column:
+        stats = {name: array[:, 0] for name, array in stats.items()}
+    return stats
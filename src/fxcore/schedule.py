@@ -0,0 +1,72 @@
+"""ECB publication schedule for expiring cached latest rates.
+
+The ECB publishes one set of reference rates per TARGET business day at
+around 16:00 CET, and Frankfurter serves them shortly after. A latest
+snapshot therefore stays current until the next business day's
+publication time. After that, the cache expires every POLL_INTERVAL until
+the new fixing shows up. Those polls are conditional requests, so an
+unchanged snapshot costs a 304.
+"""
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+ECB_TZ = ZoneInfo('Europe/Berlin')
+PUBLICATION_TIME = time(16, 0)
+
+# Seconds between polls once a fixing is due, and after POLL_WINDOW without one
+POLL_INTERVAL = 5 * 60
+POLL_WINDOW = timedelta(hours=2)
+SLOW_POLL_INTERVAL = 30 * 60
+
+
+def _easter(year):
+    """Easter Sunday in the Gregorian calendar (anonymous algorithm)"""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    w = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * w) // 451
+    month, day = divmod(h + w - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def target_holidays(year):
+    """Days the ECB publishes no reference rates, besides weekends"""
+    easter = _easter(year)
+    return {
+        date(year, 1, 1),
+        easter - timedelta(days=2),
+        easter + timedelta(days=1),
+        date(year, 5, 1),
+        date(year, 12, 25),
+        date(year, 12, 26),
+    }
+
+
+def is_business_day(day):
+    return day.weekday() < 5 and day not in target_holidays(day.year)
+
+
+def next_fixing_after(day):
+    """Publication time of the first fixing after the one dated day"""
+    day += timedelta(days=1)
+    while not is_business_day(day):
+        day += timedelta(days=1)
+    return datetime.combine(day, PUBLICATION_TIME, tzinfo=ECB_TZ)
+
+
+def latest_ttl(table, now=None):
+    """Seconds a latest-rates snapshot stays current, given its fixing date"""
+    if not getattr(table, 'date', None):
+        return POLL_INTERVAL
+    now = now or datetime.now(ECB_TZ)
+    due = next_fixing_after(date.fromisoformat(table.date))
+    if due > now:
+        return (due - now).total_seconds()
+    # Fetched before the next fixing was due, such as a table from a snapshot
+    if getattr(table, 'fetched_at', now.timestamp()) < due.timestamp():
+        return 0
+    return POLL_INTERVAL if now - due < POLL_WINDOW else SLOW_POLL_INTERVAL
@@ -0,0 +1,84 @@
+"""Compact daily rate series backed by NumPy buffers.
+
+A RateSeries holds int32 day ordinals (days since 1970-01-01) and float64
+rates in two parallel arrays sorted by date: 12 bytes per fixing instead
+of a tuple, an ISO string and a float object. Date-range slices are views
+on the same buffers and as-of lookups are binary searches.
+"""
+import numpy as np
+
+from .downsample import lttb
+
+
+def day_ordinal(value):
+    """Days since 1970-01-01 for a date or ISO date string"""
+    return int(np.datetime64(value, 'D').astype(np.int64))
+
+
+class RateSeries:
+    """Daily (date, rate) fixings for one pair, oldest first"""
+
+    __slots__ = ('days', 'rates')
+
+    def __init__(self, days=(), rates=()):
+        self.days = np.asarray(days, dtype=np.int32)
+        self.rates = np.asarray(rates, dtype=np.float64)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Series from (ISO date, rate) rows sorted by date"""
+        days = np.array([day for day, _ in rows], dtype='datetime64[D]').astype(np.int32)
+        return cls(days, [rate for _, rate in rows])
+
+    def __len__(self):
+        return len(self.days)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return RateSeries(self.days[index], self.rates[index])
+        return self.date_at(index), float(self.rates[index])
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + self.days.nbytes + self.rates.nbytes
+
+    def date_at(self, index):
+        return str(self.days[index].astype('datetime64[D]'))
+
+    @property
+    def dates(self):
+        """ISO date strings, for display"""
+        return np.datetime_as_string(self.datetimes).tolist()
+
+    @property
+    def datetimes(self):
+        return self.days.astype('datetime64[D]')
+
+    @property
+    def last(self):
+        return float(self.rates[-1])
+
+    @property
+    def high(self):
+        return float(self.rates.max())
+
+    @property
+    def low(self):
+        return float(self.rates.min())
+
+    def between(self, start, end):
+        """Fixings from start to end inclusive, sharing this series' buffers"""
+        i = np.searchsorted(self.days, day_ordinal(start), side='left')
+        j = np.searchsorted(self.days, day_ordinal(end), side='right')
+        return self[i:j]
+
+    def as_of(self, day):
+        """(date, rate) of the last fixing on or before day, or None"""
+        i = int(np.searchsorted(self.days, day_ordinal(day), side='right')) - 1
+        return self[i] if i >= 0 else None
+
+    def downsample(self, threshold):
+        """At most threshold fixings chosen by LTTB, keeping peaks and troughs"""
+        if len(self) <= threshold:
+            return self
+        keep = lttb(self.days, self.rates, threshold)
+        return RateSeries(self.days[keep], self.rates[keep])
@@ -0,0 +1,152 @@
+"""Rate cache shared by every app process on a host.
+
+Several Streamlit processes behind a load balancer would each fetch and
+hold their own copy of the same snapshots. SharedCache keeps the latest
+tables, the currency list and dated snapshots in a SQLite WAL file next
+to the history store, so a fetch made by one process serves all of them.
+
+Each entry is published by replacing a single row in one transaction, so
+a reader sees either the previous snapshot or the new one, never a mix.
+In WAL mode readers do not block on writers, and every thread reads
+through its own connection without a Python lock.
+
+Set FX_SHARED_CACHE to another file, or to "off" for a process-local cache.
+The file is opened on first use; if it cannot be, the cache stays local.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from .history_store import DEFAULT_PATH as HISTORY_PATH
+
+logger = logging.getLogger(__name__)
+
+# Endpoints whose values are shared; history already lives in the shared store
+SHARED_ENDPOINTS = {'currencies', 'latest', 'historical'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    endpoint TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (endpoint, key)
+) WITHOUT ROWID;
+"""
+
+
+def encode(value):
+    """JSON text for a shared value"""
+    from .rate_table import RateTable
+
+    if isinstance(value, RateTable):
+        value = {'rate_table': {'base': value.base, 'date': value.date,
+                                'rates': value.rates, 'fetched_at': value.fetched_at}}
+    return json.dumps(value)
+
+
+def decode(text):
+    from .rate_table import RateTable
+
+    value = json.loads(text)
+    if isinstance(value, dict) and set(value) == {'rate_table'}:
+        return RateTable(**value['rate_table'])
+    return value
+
+
+def _key(pair, date_range):
+    return json.dumps([pair, date_range])
+
+
+class SharedCache:
+    """Cache entries in a SQLite file shared by the processes on one host"""
+
+    def __init__(self, path):
+        # Nothing touches the disk until the first lookup
+        self.path = path
+        self.disabled = False
+        self._local = threading.local()
+        self.hits = 0
+        self.publishes = 0
+
+    def _conn(self):
+        """This thread's connection, or None once the file proved unusable"""
+        if self.disabled:
+            return None
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                conn = sqlite3.connect(self.path, timeout=5)
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.executescript(SCHEMA)
+            except (OSError, sqlite3.Error) as e:
+                # Keep serving from the process-local cache
+                logger.warning("Shared rate cache at %s unavailable, caching per process: %s", self.path, e)
+                self.disabled = True
+                return None
+            self._local.conn = conn
+        return conn
+
+    def get(self, endpoint, pair=None, date_range=None):
+        """(value, seconds until expiry) of a fresh shared entry, or None"""
+        if endpoint not in SHARED_ENDPOINTS:
+            return None
+        conn = self._conn()
+        if conn is None:
+            return None
+        try:
+            row = conn.execute(
+                'SELECT value, expires_at FROM cache_entries WHERE endpoint = ? AND key = ?',
+                (endpoint, _key(pair, date_range))
+            ).fetchone()
+        except sqlite3.Error as e:
+            # The shared file is an optimization; fall back to fetching
+            logger.warning("Shared rate cache unreadable: %s", e)
+            return None
+        if row is None or row[1] <= time.time():
+            return None
+        self.hits += 1
+        return decode(row[0]), row[1] - time.time()
+
+    def publish(self, endpoint, value, ttl, pair=None, date_range=None):
+        """Replace an entry for every process in one transaction"""
+        if endpoint not in SHARED_ENDPOINTS or ttl <= 0:
+            return
+        conn = self._conn()
+        if conn is None:
+            return
+        try:
+            with conn:
+                conn.execute(
+                    'INSERT OR REPLACE INTO cache_entries (endpoint, key, value, expires_at) VALUES (?, ?, ?, ?)',
+                    (endpoint, _key(pair, date_range), encode(value), time.time() + ttl)
+                )
+        except sqlite3.Error as e:
+            logger.warning("Could not publish to the shared rate cache: %s", e)
+            return
+        self.publishes += 1
+
+    def invalidate(self, endpoint=None):
+        conn = self._conn()
+        if conn is None:
+            return
+        try:
+            with conn:
+                if endpoint is None:
+                    conn.execute('DELETE FROM cache_entries')
+                else:
+                    conn.execute('DELETE FROM cache_entries WHERE endpoint = ?', (endpoint,))
+        except sqlite3.Error as e:
+            logger.warning("Could not invalidate the shared rate cache: %s", e)
+
+
+def shared_cache_from_env():
+    """SharedCache at FX_SHARED_CACHE (default: the history database), or None if "off" """
+    path = os.environ.get('FX_SHARED_CACHE', HISTORY_PATH)
+    if path == 'off':
+        return None
+    return SharedCache(os.path.expanduser(path))
@@ -0,0 +1,84 @@
+"""Request coalescing for concurrent identical calls.
+
+When several threads ask for the same key at once, only the first runs the
+call; the others wait and share its result or exception. Streamlit serves
+each session on its own thread, so this removes the burst of duplicate
+upstream requests when every open session reruns at the same moment.
+AsyncSingleFlight does the same for coroutines sharing an event loop.
+"""
+import asyncio
+import threading
+
+
+class _Call:
+    __slots__ = ('done', 'value', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Deduplicates in-flight calls by key"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    def do(self, key, fn):
+        """Run fn() once for all concurrent callers using the same key"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value
+
+    def in_flight(self):
+        """Number of calls currently running"""
+        with self._lock:
+            return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """Deduplicates in-flight coroutines by key among callers on the same event loop"""
+
+    def __init__(self):
+        self._tasks = {}  # (loop, key) -> task
+        self.shared = 0
+
+    async def do(self, key, coro_fn):
+        """Await coro_fn() once for all concurrent callers using the same key"""
+        flight = (asyncio.get_running_loop(), key)
+        task = self._tasks.get(flight)
+        if task is None:
+            task = self._tasks[flight] = asyncio.ensure_future(coro_fn())
+            task.add_done_callback(lambda _: self._tasks.pop(flight, None))
+        else:
+            self.shared += 1
+        # A cancelled caller must not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def in_flight(self):
+        """Number of calls currently running"""
+        return len(self._tasks)
@@ -0,0 +1,155 @@
+"""Binary snapshots of the rate state for warm starts.
+
+A snapshot is an uncompressed .npz file holding the currency registry, the
+latest base table and every pair in the history store as flat day/rate
+arrays. Importing it fills RATE_CACHE and the history store in one pass,
+so a fresh replica serves its first page from local data. The latest
+table is imported already stale once a newer fixing is due, and history
+coverage ends where the snapshot does, so the normal refresh paths fetch
+only the delta.
+
+    cd src && python -m fxcore.snapshot export rates.npz
+    cd src && python -m fxcore.snapshot import rates.npz
+
+Set FX_SNAPSHOT to import a snapshot when the app starts.
+"""
+import argparse
+import logging
+import os
+import sys
+import threading
+from datetime import date, timedelta
+
+import numpy as np
+
+from .history_store import get_history_store
+from .rate_cache import RATE_CACHE
+from .rate_table import DEFAULT_BASE, RateTable
+from .series import day_ordinal
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+
+_warm_started = False
+_warm_lock = threading.Lock()
+
+
+def export_snapshot(path, store=None, base=DEFAULT_BASE):
+    """Write the cached registry, latest table and history store to path.
+
+    The file is written next to path and renamed into place, so readers
+    never see a partial snapshot. Returns the number of pairs and rows.
+    """
+    store = store or get_history_store()
+    arrays = {'version': np.array(FORMAT_VERSION)}
+
+    found, names = RATE_CACHE.get_stale('currencies')
+    if found:
+        arrays['currency_codes'] = np.array(list(names), dtype=str)
+        arrays['currency_names'] = np.array(list(names.values()), dtype=str)
+
+    found, table = RATE_CACHE.get_stale('latest', pair=base)
+    if found:
+        arrays['latest_meta'] = np.array([table.base, table.date or ''], dtype=str)
+        arrays['latest_codes'] = np.array(list(table.rates), dtype=str)
+        arrays['latest_rates'] = np.array(list(table.rates.values()), dtype=np.float64)
+        arrays['latest_fetched_at'] = np.array(table.fetched_at)
+
+    pairs = store.pairs()
+    series = [store.read_series(b, q, start, end) for b, q, start, end in pairs]
+    arrays['pairs'] = np.array([[b, q] for b, q, _, _ in pairs], dtype=str).reshape(-1, 2)
+    arrays['coverage'] = np.array(
+        [[day_ordinal(start), day_ordinal(end)] for _, _, start, end in pairs], dtype=np.int32
+    ).reshape(-1, 2)
+    arrays['offsets'] = np.cumsum([0] + [len(s) for s in series], dtype=np.int64)
+    arrays['days'] = np.concatenate([s.days for s in series] or [np.empty(0, np.int32)])
+    arrays['rates'] = np.concatenate([s.rates for s in series] or [np.empty(0)])
+
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+    return {'pairs': len(pairs), 'rows': int(arrays['offsets'][-1])}
+
+
+def import_snapshot(path, store=None):
+    """Load a snapshot into RATE_CACHE and the history store.
+
+    Pairs whose stored coverage does not touch the snapshot's are skipped,
+    since each pair's coverage must stay one contiguous range. Returns the
+    number of pairs and rows imported.
+    """
+    store = store or get_history_store()
+    with np.load(path, allow_pickle=False) as data:
+        if int(data['version']) != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {int(data['version'])} in {path}")
+
+        if 'currency_codes' in data:
+            RATE_CACHE.set('currencies', dict(zip(data['currency_codes'].tolist(), data['currency_names'].tolist())))
+
+        if 'latest_meta' in data:
+            base, as_of = data['latest_meta'].tolist()
+            table = RateTable(base, as_of or None, zip(data['latest_codes'].tolist(), data['latest_rates'].tolist()),
+                              fetched_at=float(data['latest_fetched_at']))
+            # Expires by its fixing date, so an outdated table is served at once and revalidated
+            RATE_CACHE.set('latest', table, pair=base)
+
+        pairs, coverage, offsets = data['pairs'].tolist(), data['coverage'], data['offsets']
+        dates = np.datetime_as_string(data['days'].astype('datetime64[D]')).tolist()
+        rates = data['rates'].tolist()
+
+    imported = rows = 0
+    epoch = date(1970, 1, 1)
+    for i, (base, quote) in enumerate(pairs):
+        start, end = (epoch + timedelta(days=int(d)) for d in coverage[i])
+        covered = store.coverage(base, quote)
+        if covered and (start > covered[1] + timedelta(days=1) or end < covered[0] - timedelta(days=1)):
+            continue
+        lo, hi = int(offsets[i]), int(offsets[i + 1])
+        store.write(base, quote, zip(dates[lo:hi], rates[lo:hi]), start, end)
+        imported += 1
+        rows += hi - lo
+    return {'pairs': imported, 'rows': rows}
+
+
+def warm_start_from_env():
+    """Import the snapshot named by FX_SNAPSHOT once per process"""
+    global _warm_started
+    path = os.environ.get('FX_SNAPSHOT')
+    with _warm_lock:
+        if not path or _warm_started:
+            return None
+        _warm_started = True
+        if not os.path.exists(path):
+            logger.info("No rate snapshot at %s, starting cold", path)
+            return None
+        try:
+            return import_snapshot(path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Could not import rate snapshot %s: %s", path, e)
+            return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or import a binary rate snapshot")
+    parser.add_argument('action', choices=['export', 'import'])
+    parser.add_argument('path', help=".npz snapshot file")
+    args = parser.parse_args(argv)
+
+    if args.action == 'export':
+        # A fresh process has nothing cached in memory; load the registry and latest table first
+        from .api import load_currencies
+        from .rate_table import fetch_rate_table
+        load_currencies()
+        fetch_rate_table()
+        result = export_snapshot(args.path)
+    else:
+        result = import_snapshot(args.path)
+    print(f"{args.action.capitalize()}ed {result['pairs']} pairs ({result['rows']} rows) "
+          f"{'to' if args.action == 'export' else 'from'} {args.path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
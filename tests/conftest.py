@@ -0,0 +1,7 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+# Keep test runs off the real upstream and the user's cache directory
+os.environ.setdefault('FX_SHARED_CACHE', 'off')
+os.environ.setdefault('FX_PROVIDER', 'fake')
@@ -0,0 +1,32 @@
+from datetime import date, timedelta
+
+import pytest
+import requests
+
+from fxcore.asof import AsOfIndex
+from fxcore.history_store import HistoryStore
+from fxcore.providers import FakeProvider, set_provider
+
+
+class DownProvider(FakeProvider):
+    def history(self, base, quote, start, end):
+        raise requests.exceptions.ConnectionError("upstream down")
+
+
+@pytest.fixture
+def down_provider():
+    previous = set_provider(DownProvider())
+    yield
+    set_provider(previous)
+
+
+def test_stale_coverage_is_not_served_when_the_backfill_fails(down_provider):
+    store = HistoryStore(':memory:')
+    start, end = date(2021, 6, 1), date(2021, 7, 6)
+    rows = [((start + timedelta(days=i)).isoformat(), 0.8) for i in range((end - start).days + 1)]
+    store.write('EUR', 'GBP', rows, start, end)
+    index = AsOfIndex(store)
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        index.fixing('GBP', date(2024, 6, 3))
+    assert index.fixing('GBP', date(2021, 7, 4)) == ('2021-07-04', 0.8)
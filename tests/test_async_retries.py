@@ -0,0 +1,57 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from fxcore.api import fetch_exchange_rate
+from fxcore.async_client import prefetch
+from fxcore.providers import FrankfurterProvider, set_provider
+from fxcore.rate_cache import RATE_CACHE
+
+LATEST = {'amount': 1.0, 'base': 'EUR', 'date': '2024-01-02', 'rates': {'USD': 1.1, 'GBP': 0.86}}
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Answers /latest with one 503, then normally"""
+
+    failures_left = 1
+    calls = 0
+
+    def do_GET(self):
+        type(self).calls += 1
+        if self.path.startswith('/latest') and type(self).failures_left:
+            type(self).failures_left -= 1
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = json.dumps(LATEST).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def flaky_upstream():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    previous = set_provider(FrankfurterProvider(f"http://127.0.0.1:{server.server_address[1]}"))
+    RATE_CACHE.invalidate()
+    yield FlakyHandler
+    set_provider(previous)
+    RATE_CACHE.invalidate()
+    server.shutdown()
+
+
+def test_prefetch_retries_a_transient_error(flaky_upstream):
+    assert prefetch(currencies=False) == []
+    assert flaky_upstream.calls == 2
+    result = fetch_exchange_rate('USD', 'GBP')
+    assert result['error'] is None
+    assert result['rate'] == pytest.approx(0.86 / 1.1)
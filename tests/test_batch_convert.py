@@ -0,0 +1,16 @@
+import pandas as pd
+
+from fxcore.batch_convert import DatedMatrices, convert_chunk
+
+
+def test_rows_with_bad_amounts_are_flagged_not_priced():
+    frame = pd.DataFrame({
+        'amount': ['10', 'abc', '', '5'],
+        'from': ['USD'] * 4,
+        'to': ['EUR', 'EUR', 'EUR', 'GBP'],
+        'date': ['2024-01-02'] * 4,
+    })
+    out = convert_chunk(frame, DatedMatrices())
+    assert out['error'].tolist() == ['', 'invalid_amount', 'invalid_amount', '']
+    assert out['rate'][[1, 2]].isna().all()
+    assert out['converted_amount'][[0, 3]].notna().all()
@@ -0,0 +1,88 @@
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+
+from fxcore.async_client import AsyncFrankfurterClient
+from fxcore.budget import BudgetExceededError, upstream_budget
+from fxcore.frankfurter import CircuitBreaker, ProviderClient
+from fxcore.ratelimit import PriorityLimiter
+
+
+@pytest.fixture
+def silent_url():
+    """URL of a server that accepts connections and never answers"""
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(8)
+    yield f"http://127.0.0.1:{sock.getsockname()[1]}/latest"
+    sock.close()
+
+
+def half_open_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.state == 'half_open'
+    return breaker
+
+
+def test_probe_released_when_budget_is_spent_before_the_call(silent_url):
+    client = ProviderClient(breaker=half_open_breaker())
+    with upstream_budget(0), pytest.raises(BudgetExceededError):
+        client.get_json(silent_url, timeout=5)
+    assert client.breaker.allow()
+
+
+def test_probe_released_when_budget_cuts_the_call_short(silent_url):
+    client = ProviderClient(breaker=half_open_breaker())
+    with upstream_budget(0.2), pytest.raises(BudgetExceededError):
+        client.get_json(silent_url, timeout=5)
+    assert client.breaker.state == 'half_open'
+    assert client.breaker.allow()
+
+
+def test_async_probe_released_when_budget_cuts_the_call_short(silent_url, monkeypatch):
+    breaker = half_open_breaker()
+    monkeypatch.setattr('fxcore.async_client.CLIENT.breaker', breaker)
+
+    async def call():
+        async with AsyncFrankfurterClient(timeout=5) as client:
+            with upstream_budget(0.2):
+                await client.get_json(silent_url)
+
+    with pytest.raises(BudgetExceededError):
+        asyncio.run(call())
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_and_successful_probe_closes():
+    breaker = half_open_breaker()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+
+
+def test_probe_not_claimed_while_waiting_for_a_rate_limit_token(silent_url, monkeypatch):
+    limiter = PriorityLimiter(rate=1, burst=1)
+    limiter.acquire()
+    monkeypatch.setattr('fxcore.ratelimit.LIMITER', limiter)
+    client = ProviderClient(breaker=half_open_breaker())
+
+    def call():
+        with upstream_budget(0.3), pytest.raises(BudgetExceededError):
+            client.get_json(silent_url, timeout=5)
+
+    waiter = threading.Thread(target=call)
+    waiter.start()
+    time.sleep(0.1)
+    assert limiter.queued()['interactive'] == 1
+    assert client.breaker.allow()
+    waiter.join()
@@ -0,0 +1,15 @@
+import requests
+
+from fxcore import cross_matrix
+from fxcore.cross_matrix import convert_many
+
+
+def test_unsupported_codes_are_reported_without_a_matrix(monkeypatch):
+    def offline():
+        raise requests.exceptions.ConnectionError("offline")
+
+    monkeypatch.setattr(cross_matrix, 'fetch_cross_matrix', offline)
+    out = convert_many([1, 1, 1, 1], ['USD', 'NGN', 'USD', 'NGN'], ['EUR', 'USD', 'KES', 'NGN'])
+    assert out['unsupported'].tolist() == [False, True, True, False]
+    assert out['unavailable'].tolist() == [True, False, False, False]
+    assert out['rate'][3] == 1.0
@@ -0,0 +1,24 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from fxcore.history_frame import HistoryFrame
+
+
+def test_downsample_keeps_a_shared_index_and_each_quotes_extremes():
+    days = [(date(2015, 1, 1) + timedelta(days=i)).isoformat() for i in range(3650)]
+    gbp = np.sin(np.arange(3650) / 50.0) + 2
+    jpy = np.cos(np.arange(3650) / 70.0) + 120
+    jpy[:100] = np.nan
+    frame = HistoryFrame('USD', days, {'GBP': gbp, 'JPY': jpy})
+
+    chart = frame.downsample(600)
+    assert len(chart) <= 600
+    assert chart.dates[0] == days[0] and chart.dates[-1] == days[-1]
+    for quote, column in frame.columns.items():
+        kept = chart.columns[quote]
+        assert np.nanmax(kept) == pytest.approx(np.nanmax(column), abs=1e-3)
+        assert np.nanmin(kept) == pytest.approx(np.nanmin(column), abs=1e-3)
+        assert chart.rebased()[quote][~np.isnan(kept)][0] == 100.0
+    assert frame.downsample(5000) is frame
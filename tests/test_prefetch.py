@@ -0,0 +1,79 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from fxcore.async_client import prefetch
+from fxcore import budget
+from fxcore.budget import upstream_budget
+from fxcore.history_store import HistoryStore, set_history_store
+from fxcore.providers import FakeProvider, set_provider
+from fxcore.rate_cache import RATE_CACHE
+from fxcore.rate_table import RateTable, fetch_rate_table
+
+
+@pytest.fixture
+def slow_provider():
+    provider = FakeProvider(latency=0.5)
+    previous = set_provider(provider)
+    RATE_CACHE.invalidate()
+    yield provider
+    set_provider(previous)
+    RATE_CACHE.invalidate()
+
+
+def test_stale_entries_are_revalidated_in_the_background(slow_provider):
+    stale = RateTable('EUR', '2024-01-02', {'USD': 1.09}, fetched_at=time.time() - 86400)
+    RATE_CACHE.set('latest', stale, pair='EUR', ttl=0)
+    RATE_CACHE.set('currencies', {'EUR': 'Euro', 'USD': 'US Dollar'}, ttl=0)
+
+    start = time.perf_counter()
+    assert prefetch() == []
+    assert fetch_rate_table() is stale
+    assert time.perf_counter() - start < 0.2
+
+
+class BudgetRecordingProvider(FakeProvider):
+    def currencies(self):
+        self.seen = budget.remaining()
+        return super().currencies()
+
+
+def test_prefetch_loop_runs_in_the_callers_budget():
+    provider = BudgetRecordingProvider()
+    previous = set_provider(provider)
+    RATE_CACHE.invalidate()
+    try:
+        with upstream_budget(30):
+            assert prefetch(latest=False) == []
+    finally:
+        set_provider(previous)
+        RATE_CACHE.invalidate()
+    assert 0 < provider.seen <= 30
+
+
+class HistoryRecordingProvider(FakeProvider):
+    def __init__(self):
+        super().__init__(latency=0.5)
+        self.windows = []
+
+    def history(self, base, quote, start, end):
+        self.windows.append((base, quote))
+        return super().history(base, quote, start, end)
+
+
+def test_concurrent_prefetches_share_requests():
+    provider = HistoryRecordingProvider()
+    previous = set_provider(provider), set_history_store(HistoryStore(':memory:'))
+    RATE_CACHE.invalidate()
+    pairs = [('EUR', 'USD'), ('EUR', 'GBP')]
+    try:
+        with ThreadPoolExecutor(10) as pool:
+            results = list(pool.map(lambda _: prefetch(pairs, ('2024-01-01', '2024-03-01')), range(10)))
+    finally:
+        set_provider(previous[0])
+        set_history_store(previous[1])
+        RATE_CACHE.invalidate()
+
+    assert results == [[]] * 10
+    assert sorted(provider.windows) == sorted(pairs)
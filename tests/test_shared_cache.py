@@ -0,0 +1,19 @@
+from fxcore.rate_cache import TTLCache
+from fxcore.shared_cache import SharedCache
+
+
+def test_nothing_is_written_until_first_use(tmp_path):
+    path = tmp_path / 'cache' / 'shared.sqlite3'
+    shared = SharedCache(str(path))
+    assert not path.parent.exists()
+    shared.publish('currencies', {'EUR': 'Euro'}, 60)
+    assert path.exists()
+    assert shared.get('currencies')[0] == {'EUR': 'Euro'}
+
+
+def test_unusable_path_falls_back_to_a_local_cache():
+    cache = TTLCache(backend=SharedCache('/proc/nope/shared.sqlite3'))
+    cache.set('currencies', {'EUR': 'Euro'})
+    cache.invalidate('latest')
+    assert cache.get('currencies') == (True, {'EUR': 'Euro'})
+    assert cache.backend.disabled